@@ -0,0 +1,39 @@
+import sys
+from datetime import date
+
+from src.bootstrap import init_minio_client
+from src.card_of_poject.archive import archive_projects
+from src.card_of_poject.model import Project
+from src.card_of_poject.repository.project import ProjectRepository
+from src.config import settings
+from src.core.minio.handler import MinioHandler
+from src.database import session_maker
+
+import structlog
+
+log = structlog.get_logger()
+
+
+async def command(before_year: int):
+    """Переносит завершённые проекты прошлых лет в архив (Parquet в MinIO).
+
+    Завершённый проект — на этапе с вероятностью 0 или 100. По умолчанию
+    архивируются проекты с `implementation_year` раньше текущего года.
+    Вернуть проект можно через POST /projects/{oid}/restore.
+    """
+    storage = MinioHandler(
+        client=init_minio_client(settings.minio),
+        bucket=settings.minio.private_bucket,
+    )
+    async with session_maker() as session:
+        project_repo = ProjectRepository(session, model=Project)
+        archived = await archive_projects(project_repo, storage, before_year)
+
+    log.info("Архивация завершена", before_year=before_year, projects=archived)
+
+
+if __name__ == "__main__":
+    from anyio import run
+
+    year = int(sys.argv[1]) if len(sys.argv) > 1 else date.today().year
+    run(command, year)
@@ -0,0 +1,85 @@
+import sys
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.card_of_poject.model import Project
+from src.card_of_poject.repository.project import (
+    PROJECT_REFERENCE_MODELS,
+    ProjectRepository,
+)
+from src.card_of_poject.schemas.project import (
+    PROJECT_BULK_LIMIT,
+    ProjectBulkUpdateItem,
+    ProjectCreate,
+)
+from src.database import engine
+
+import structlog
+
+log = structlog.get_logger()
+
+
+async def command() -> bool:
+    """Проверяет, что пачка ровно из `PROJECT_BULK_LIMIT` элементов проходит.
+
+    INFO: bulk_create и bulk_update выполняются на настоящей БД внутри
+    внешней транзакции, которая в конце откатывается: commit репозитория
+    становится точкой сохранения (join_transaction_mode), и данные в базе
+    не остаются. Нужны хотя бы по одной строке в справочниках.
+    """
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            references = {
+                field: await session.scalar(select(model.oid).limit(1))
+                for field, model in PROJECT_REFERENCE_MODELS.items()
+            }
+            items = [
+                ProjectCreate(
+                    name=f"bulk check {index}",
+                    organization_name=f"bulk check {index}",
+                    **references,
+                ).model_dump()
+                for index in range(PROJECT_BULK_LIMIT)
+            ]
+            project_repo = ProjectRepository(session, model=Project)
+            created = await project_repo.bulk_create(items)
+            oids = [result["oid"] for result in created if result["status"] == "created"]
+            result = await session.execute(
+                select(Project.oid, Project.version).where(Project.oid.in_(oids))
+            )
+            # разный набор полей у элементов — как у реального PATCH /projects/bulk
+            updates = [
+                ProjectBulkUpdateItem(
+                    oid=oid,
+                    version=version,
+                    name=f"bulk check {index} updated",
+                    **({"current_status": "checked"} if index % 2 else {}),
+                ).model_dump(exclude_unset=True)
+                for index, (oid, version) in enumerate(result.tuples())
+            ]
+            updated = await project_repo.bulk_update(updates)
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+    ok = (
+        len(oids) == PROJECT_BULK_LIMIT
+        and sum(result["status"] == "updated" for result in updated) == PROJECT_BULK_LIMIT
+    )
+    log.info(
+        "Проверка пачки",
+        limit=PROJECT_BULK_LIMIT,
+        created=len(oids),
+        updated=sum(result["status"] == "updated" for result in updated),
+        ok=ok,
+    )
+    return ok
+
+
+if __name__ == "__main__":
+    from anyio import run
+
+    sys.exit(0 if run(command) else 1)
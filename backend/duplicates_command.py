@@ -0,0 +1,71 @@
+from typing import Dict
+from uuid import UUID
+
+from sqlalchemy import select
+
+from src.card_of_poject.model import Project
+from src.card_of_poject.repository.project import ProjectRepository
+from src.database import session_maker
+
+import structlog
+
+log = structlog.get_logger()
+
+BATCH_SIZE = 500
+
+
+def _find(parents: Dict[UUID, UUID], oid: UUID) -> UUID:
+    root = parents.setdefault(oid, oid)
+    while root != parents[root]:
+        root = parents[root]
+    # сжатие пути: следующие поиски идут сразу к корню
+    while oid != root:
+        parents[oid], oid = root, parents[oid]
+    return root
+
+
+async def command():
+    """Группирует уже заведённые проекты-дубли одной организации.
+
+    Проекты обходятся пачками по oid; для каждого ищутся похожие через
+    индексы (см. `ProjectRepository.duplicate_pairs`), а найденные пары
+    склеиваются в группы (union-find). Каждая группа пишется в лог.
+    """
+    parents: Dict[UUID, UUID] = {}
+    names: Dict[UUID, str] = {}
+    last_oid = None
+    total = 0
+    async with session_maker() as session:
+        project_repo = ProjectRepository(session, model=Project)
+        while True:
+            query = select(Project.oid).order_by(Project.oid).limit(BATCH_SIZE)
+            if last_oid is not None:
+                query = query.where(Project.oid > last_oid)
+            oids = (await session.execute(query)).scalars().all()
+            if not oids:
+                break
+            for pair in await project_repo.duplicate_pairs(oids):
+                names[pair.oid] = pair.organization_name
+                names[pair.duplicate_id] = pair.duplicate_organization_name
+                parents[_find(parents, pair.duplicate_id)] = _find(parents, pair.oid)
+            await session.rollback()
+            last_oid = oids[-1]
+            total += len(oids)
+            log.info("Проекты проверены", projects=total)
+
+    clusters: Dict[UUID, list] = {}
+    for oid in parents:
+        clusters.setdefault(_find(parents, oid), []).append(oid)
+    for members in clusters.values():
+        log.info(
+            "Дубли организации",
+            organizations=sorted({names[oid] for oid in members}),
+            projects=[str(oid) for oid in members],
+        )
+    log.info("Поиск дублей завершён", projects=total, clusters=len(clusters))
+
+
+if __name__ == "__main__":
+    from anyio import run
+
+    run(command)
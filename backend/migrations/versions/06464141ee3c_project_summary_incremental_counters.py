@@ -0,0 +1,409 @@
+"""project summary incremental counters
+
+Revision ID: 06464141ee3c
+Revises: 122b54d1b241
+Create Date: 2026-10-18 18:27:53.918402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '06464141ee3c'
+down_revision: Union[str, Sequence[str], None] = '122b54d1b241'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# INFO: сводка с нуля для списка проектов. Ей пересобирает сводку
+# project_summary_refresh, и по ней же summary_command.py ищет
+# расхождения со счётчиками, которые ведут триггеры ниже.
+COMPUTE_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_compute(pids uuid[])
+RETURNS TABLE (
+    project_id uuid,
+    total_revenue numeric,
+    total_costs numeric,
+    weighted_revenue numeric,
+    probability numeric,
+    last_stage_change_at timestamptz,
+    last_activity_at timestamptz,
+    comments_count integer,
+    history_count integer
+) AS $$
+    SELECT
+        p.oid,
+        f.revenue,
+        f.costs,
+        round(f.revenue * coalesce(p.probability, 0) / 100, 2),
+        coalesce(p.probability, 0),
+        h.stage_changed_at,
+        greatest(
+            coalesce(p.update_at, p.created_at),
+            f.changed_at, h.changed_at, c.created_at, pr.calculated_at
+        ),
+        c.comments::integer,
+        h.history::integer
+    FROM projects p
+    CROSS JOIN LATERAL (
+        SELECT
+            coalesce(sum(fp.revenue), 0) AS revenue,
+            coalesce(sum(fp.costs), 0) AS costs,
+            max(coalesce(fp.update_at, fp.created_at)) AS changed_at
+        FROM financial_periods fp WHERE fp.project_id = p.oid
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT
+            count(*) AS history,
+            max(ph.changed_at) AS changed_at,
+            max(ph.changed_at) FILTER (WHERE ph.field_changed = 'stage_id') AS stage_changed_at
+        FROM project_historys ph WHERE ph.project_id = p.oid
+    ) h
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS comments, max(coalesce(cm.update_at, cm.created_at)) AS created_at
+        FROM comments cm WHERE cm.project_id = p.oid
+    ) c
+    CROSS JOIN LATERAL (
+        SELECT max(pp.calculated_at) AS calculated_at
+        FROM project_predictions pp WHERE pp.project_id = p.oid
+    ) pr
+    WHERE p.oid = ANY(pids) AND NOT p.is_archived;
+$$ LANGUAGE sql STABLE;
+"""
+
+REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_refresh(pids uuid[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (
+        project_id, total_revenue, total_costs, weighted_revenue, probability,
+        last_stage_change_at, last_activity_at, comments_count, history_count,
+        refreshed_at
+    )
+    SELECT c.*, now() FROM project_summary_compute(pids) c
+    ON CONFLICT (project_id) DO UPDATE SET
+        total_revenue = EXCLUDED.total_revenue,
+        total_costs = EXCLUDED.total_costs,
+        weighted_revenue = EXCLUDED.weighted_revenue,
+        probability = EXCLUDED.probability,
+        last_stage_change_at = EXCLUDED.last_stage_change_at,
+        last_activity_at = EXCLUDED.last_activity_at,
+        comments_count = EXCLUDED.comments_count,
+        history_count = EXCLUDED.history_count,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_refresh(pids uuid[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (
+        project_id, total_revenue, total_costs, weighted_revenue, probability,
+        last_stage_change_at, last_activity_at, comments_count, refreshed_at
+    )
+    SELECT
+        p.oid,
+        f.revenue,
+        f.costs,
+        f.revenue * coalesce(p.probability, 0) / 100,
+        coalesce(p.probability, 0),
+        h.changed_at,
+        greatest(
+            coalesce(p.update_at, p.created_at),
+            f.changed_at, a.changed_at, c.created_at, pr.calculated_at
+        ),
+        c.comments,
+        now()
+    FROM projects p
+    CROSS JOIN LATERAL (
+        SELECT
+            coalesce(sum(revenue), 0) AS revenue,
+            coalesce(sum(costs), 0) AS costs,
+            max(coalesce(update_at, created_at)) AS changed_at
+        FROM financial_periods WHERE project_id = p.oid
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys
+        WHERE project_id = p.oid AND field_changed = 'stage_id'
+    ) h
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys WHERE project_id = p.oid
+    ) a
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS comments, max(created_at) AS created_at
+        FROM comments WHERE project_id = p.oid
+    ) c
+    CROSS JOIN LATERAL (
+        SELECT max(calculated_at) AS calculated_at
+        FROM project_predictions WHERE project_id = p.oid
+    ) pr
+    WHERE p.oid = ANY(pids) AND NOT p.is_archived
+    ON CONFLICT (project_id) DO UPDATE SET
+        total_revenue = EXCLUDED.total_revenue,
+        total_costs = EXCLUDED.total_costs,
+        weighted_revenue = EXCLUDED.weighted_revenue,
+        probability = EXCLUDED.probability,
+        last_stage_change_at = EXCLUDED.last_stage_change_at,
+        last_activity_at = EXCLUDED.last_activity_at,
+        comments_count = EXCLUDED.comments_count,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# INFO: вместо полного пересчёта сводки на каждую строку — приращения на
+# оператор: триггеры FOR EACH STATEMENT с переходными таблицами old_rows /
+# new_rows сворачивают изменённые строки по project_id. Вычитается старое
+# состояние (UPDATE, DELETE), прибавляется новое (INSERT, UPDATE). Новое —
+# через upsert: в одном операторе с проектом (клонирование) строки сводки
+# может ещё не быть. Пакетная очистка и архивация ставят
+# project_summary.skip, восстановление потом пересобирает сводку целиком.
+PERIODS_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_periods_changed() RETURNS trigger AS $$
+BEGIN
+    IF coalesce(current_setting('project_summary.skip', true), '') = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE project_summaries s SET
+            total_revenue = s.total_revenue - d.revenue,
+            total_costs = s.total_costs - d.costs,
+            weighted_revenue = round((s.total_revenue - d.revenue) * s.probability / 100, 2),
+            refreshed_at = now()
+        FROM (
+            SELECT project_id, coalesce(sum(revenue), 0) AS revenue, coalesce(sum(costs), 0) AS costs
+            FROM old_rows GROUP BY project_id
+        ) d
+        WHERE s.project_id = d.project_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO project_summaries AS s (
+            project_id, total_revenue, total_costs, weighted_revenue, probability,
+            last_activity_at
+        )
+        SELECT
+            n.project_id, n.revenue, n.costs,
+            round(n.revenue * coalesce(p.probability, 0) / 100, 2),
+            coalesce(p.probability, 0),
+            n.changed_at
+        FROM (
+            SELECT
+                project_id,
+                coalesce(sum(revenue), 0) AS revenue,
+                coalesce(sum(costs), 0) AS costs,
+                max(coalesce(update_at, created_at)) AS changed_at
+            FROM new_rows GROUP BY project_id
+        ) n
+        JOIN projects p ON p.oid = n.project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            total_revenue = s.total_revenue + EXCLUDED.total_revenue,
+            total_costs = s.total_costs + EXCLUDED.total_costs,
+            weighted_revenue = round((s.total_revenue + EXCLUDED.total_revenue) * s.probability / 100, 2),
+            last_activity_at = greatest(s.last_activity_at, EXCLUDED.last_activity_at),
+            refreshed_at = now();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+COMMENTS_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_comments_changed() RETURNS trigger AS $$
+BEGIN
+    IF coalesce(current_setting('project_summary.skip', true), '') = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE project_summaries s SET
+            comments_count = s.comments_count - d.comments,
+            refreshed_at = now()
+        FROM (SELECT project_id, count(*) AS comments FROM old_rows GROUP BY project_id) d
+        WHERE s.project_id = d.project_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO project_summaries AS s (project_id, comments_count, last_activity_at)
+        SELECT project_id, count(*), max(coalesce(update_at, created_at))
+        FROM new_rows GROUP BY project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            comments_count = s.comments_count + EXCLUDED.comments_count,
+            last_activity_at = greatest(s.last_activity_at, EXCLUDED.last_activity_at),
+            refreshed_at = now();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+HISTORY_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_history_changed() RETURNS trigger AS $$
+BEGIN
+    IF coalesce(current_setting('project_summary.skip', true), '') = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- максимум не вычесть: если ушла смена этапа, он ищется заново по индексу
+        UPDATE project_summaries s SET
+            history_count = s.history_count - d.history,
+            last_stage_change_at = CASE WHEN d.stage_changes > 0 THEN (
+                SELECT max(h.changed_at) FROM project_historys h
+                WHERE h.project_id = s.project_id AND h.field_changed = 'stage_id'
+            ) ELSE s.last_stage_change_at END,
+            refreshed_at = now()
+        FROM (
+            SELECT
+                project_id,
+                count(*) AS history,
+                count(*) FILTER (WHERE field_changed = 'stage_id') AS stage_changes
+            FROM old_rows GROUP BY project_id
+        ) d
+        WHERE s.project_id = d.project_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO project_summaries AS s (
+            project_id, history_count, last_stage_change_at, last_activity_at
+        )
+        SELECT
+            project_id,
+            count(*),
+            max(changed_at) FILTER (WHERE field_changed = 'stage_id'),
+            max(changed_at)
+        FROM new_rows GROUP BY project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            history_count = s.history_count + EXCLUDED.history_count,
+            last_stage_change_at = greatest(s.last_stage_change_at, EXCLUDED.last_stage_change_at),
+            last_activity_at = greatest(s.last_activity_at, EXCLUDED.last_activity_at),
+            refreshed_at = now();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREDICTIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_predictions_changed() RETURNS trigger AS $$
+BEGIN
+    IF coalesce(current_setting('project_summary.skip', true), '') = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        UPDATE project_summaries SET refreshed_at = now()
+        WHERE project_id IN (SELECT project_id FROM old_rows);
+    ELSE
+        INSERT INTO project_summaries AS s (project_id, last_activity_at)
+        SELECT project_id, max(calculated_at) FROM new_rows GROUP BY project_id
+        ON CONFLICT (project_id) DO UPDATE SET
+            last_activity_at = greatest(s.last_activity_at, EXCLUDED.last_activity_at),
+            refreshed_at = now();
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Правка проекта: нужна только строка сводки и взвешенная выручка.
+PROJECT_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_project_changed() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (project_id, probability, last_activity_at)
+    VALUES (NEW.oid, coalesce(NEW.probability, 0), coalesce(NEW.update_at, NEW.created_at))
+    ON CONFLICT (project_id) DO UPDATE SET
+        probability = EXCLUDED.probability,
+        weighted_revenue = round(s.total_revenue * EXCLUDED.probability / 100, 2),
+        refreshed_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_PROJECT_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_project_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM project_summary_refresh(ARRAY[NEW.oid]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_CHILD_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_child_changed() RETURNS trigger AS $$
+BEGIN
+    IF coalesce(current_setting('project_summary.skip', true), '') = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        PERFORM project_summary_refresh(ARRAY[NEW.project_id]);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM project_summary_refresh(ARRAY[OLD.project_id]);
+    ELSE
+        PERFORM project_summary_refresh(ARRAY[OLD.project_id, NEW.project_id]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CHILD_FUNCTIONS = {
+    'financial_periods': ('project_summary_periods_changed', PERIODS_FUNCTION),
+    'comments': ('project_summary_comments_changed', COMMENTS_FUNCTION),
+    'project_historys': ('project_summary_history_changed', HISTORY_FUNCTION),
+    'project_predictions': ('project_summary_predictions_changed', PREDICTIONS_FUNCTION),
+}
+# построчные триггеры из fe519a7f5579 и be9d08839de9
+PREVIOUS_TRIGGERS = {
+    'financial_periods': 'financial_periods_project_summary',
+    'comments': 'comments_project_summary',
+    'project_historys': 'project_historys_project_summary',
+    'project_predictions': 'project_predictions_project_summary',
+}
+# переходные таблицы у триггера — только для одного события
+TRANSITIONS = {
+    'INSERT': 'NEW TABLE AS new_rows',
+    'UPDATE': 'OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'OLD TABLE AS old_rows',
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('project_summaries', sa.Column('history_count', sa.Integer(), server_default='0', nullable=False))
+    # ### end Alembic commands ###
+    op.execute(COMPUTE_FUNCTION)
+    op.execute(REFRESH_FUNCTION)
+    op.execute(PROJECT_FUNCTION)
+    for table, (function, body) in CHILD_FUNCTIONS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {PREVIOUS_TRIGGERS[table]} ON {table}")
+        op.execute(body)
+        for event, transition in TRANSITIONS.items():
+            op.execute(
+                f"CREATE TRIGGER {table}_summary_{event.lower()} "
+                f"AFTER {event} ON {table} REFERENCING {transition} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+            )
+    op.execute("DROP FUNCTION IF EXISTS project_summary_child_changed()")
+    op.execute("SELECT project_summary_refresh(array(SELECT oid FROM projects))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(PREVIOUS_CHILD_FUNCTION)
+    for table, (function, _) in CHILD_FUNCTIONS.items():
+        for event in TRANSITIONS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_summary_{event.lower()} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {function}()")
+        op.execute(
+            f"CREATE TRIGGER {PREVIOUS_TRIGGERS[table]} "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION project_summary_child_changed()"
+        )
+    op.execute(PREVIOUS_PROJECT_FUNCTION)
+    op.execute(PREVIOUS_REFRESH_FUNCTION)
+    op.execute("DROP FUNCTION IF EXISTS project_summary_compute(uuid[])")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_column('project_summaries', 'history_count')
+    # ### end Alembic commands ###
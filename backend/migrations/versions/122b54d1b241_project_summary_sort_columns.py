@@ -0,0 +1,173 @@
+"""project summary sort columns
+
+Revision ID: 122b54d1b241
+Revises: 5790a74c4698
+Create Date: 2026-10-18 17:51:36.204871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '122b54d1b241'
+down_revision: Union[str, Sequence[str], None] = '5790a74c4698'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_refresh(pids uuid[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (
+        project_id, total_revenue, total_costs, weighted_revenue, probability,
+        last_stage_change_at, last_activity_at, comments_count, refreshed_at
+    )
+    SELECT
+        p.oid,
+        f.revenue,
+        f.costs,
+        f.revenue * coalesce(p.probability, 0) / 100,
+        coalesce(p.probability, 0),
+        h.changed_at,
+        greatest(
+            coalesce(p.update_at, p.created_at),
+            f.changed_at, a.changed_at, c.created_at, pr.calculated_at
+        ),
+        c.comments,
+        now()
+    FROM projects p
+    CROSS JOIN LATERAL (
+        SELECT
+            coalesce(sum(revenue), 0) AS revenue,
+            coalesce(sum(costs), 0) AS costs,
+            max(coalesce(update_at, created_at)) AS changed_at
+        FROM financial_periods WHERE project_id = p.oid
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys
+        WHERE project_id = p.oid AND field_changed = 'stage_id'
+    ) h
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys WHERE project_id = p.oid
+    ) a
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS comments, max(created_at) AS created_at
+        FROM comments WHERE project_id = p.oid
+    ) c
+    CROSS JOIN LATERAL (
+        SELECT max(calculated_at) AS calculated_at
+        FROM project_predictions WHERE project_id = p.oid
+    ) pr
+    WHERE p.oid = ANY(pids) AND NOT p.is_archived
+    ON CONFLICT (project_id) DO UPDATE SET
+        total_revenue = EXCLUDED.total_revenue,
+        total_costs = EXCLUDED.total_costs,
+        weighted_revenue = EXCLUDED.weighted_revenue,
+        probability = EXCLUDED.probability,
+        last_stage_change_at = EXCLUDED.last_stage_change_at,
+        last_activity_at = EXCLUDED.last_activity_at,
+        comments_count = EXCLUDED.comments_count,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_refresh(pids uuid[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (
+        project_id, total_revenue, total_costs, weighted_revenue,
+        last_stage_change_at, comments_count, refreshed_at
+    )
+    SELECT
+        p.oid,
+        f.revenue,
+        f.costs,
+        f.revenue * coalesce(p.probability, 0) / 100,
+        h.changed_at,
+        c.comments,
+        now()
+    FROM projects p
+    CROSS JOIN LATERAL (
+        SELECT coalesce(sum(revenue), 0) AS revenue, coalesce(sum(costs), 0) AS costs
+        FROM financial_periods WHERE project_id = p.oid
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys
+        WHERE project_id = p.oid AND field_changed = 'stage_id'
+    ) h
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS comments FROM comments WHERE project_id = p.oid
+    ) c
+    WHERE p.oid = ANY(pids) AND NOT p.is_archived
+    ON CONFLICT (project_id) DO UPDATE SET
+        total_revenue = EXCLUDED.total_revenue,
+        total_costs = EXCLUDED.total_costs,
+        weighted_revenue = EXCLUDED.weighted_revenue,
+        last_stage_change_at = EXCLUDED.last_stage_change_at,
+        comments_count = EXCLUDED.comments_count,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# INFO: правка самого проекта (PUT, bulk) сводку не пересчитывает — только
+# сдвигает last_activity_at, это одна строка по первичному ключу.
+TOUCH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_touch() RETURNS trigger AS $$
+BEGIN
+    UPDATE project_summaries
+    SET last_activity_at = NEW.update_at
+    WHERE project_id = NEW.oid AND last_activity_at < NEW.update_at;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.add_column('project_summaries', sa.Column('probability', sa.Numeric(precision=5, scale=2), server_default='0', nullable=False))
+    op.add_column('project_summaries', sa.Column('last_activity_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index('ix_project_summaries_last_activity_at', 'project_summaries', ['last_activity_at', 'project_id'], unique=False)
+    op.create_index('ix_project_summaries_probability', 'project_summaries', ['probability', 'project_id'], unique=False)
+    op.create_index('ix_project_summaries_total_revenue', 'project_summaries', ['total_revenue', 'project_id'], unique=False)
+    op.create_index('ix_project_summaries_weighted_revenue', 'project_summaries', ['weighted_revenue', 'project_id'], unique=False)
+    # ### end Alembic commands ###
+    op.execute(REFRESH_FUNCTION)
+    op.execute(TOUCH_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER projects_project_summary_touch "
+        "AFTER UPDATE OF update_at ON projects "
+        "FOR EACH ROW WHEN (NEW.update_at IS NOT NULL) "
+        "EXECUTE FUNCTION project_summary_touch()"
+    )
+    # архивные проекты refresh пропускает — им вероятность проставляется отдельно
+    op.execute(
+        "UPDATE project_summaries s SET probability = coalesce(p.probability, 0), "
+        "last_activity_at = coalesce(p.update_at, p.created_at) "
+        "FROM projects p WHERE p.oid = s.project_id AND p.is_archived"
+    )
+    op.execute("SELECT project_summary_refresh(array(SELECT oid FROM projects))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS projects_project_summary_touch ON projects")
+    op.execute("DROP FUNCTION IF EXISTS project_summary_touch()")
+    op.execute(PREVIOUS_REFRESH_FUNCTION)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_project_summaries_weighted_revenue', table_name='project_summaries')
+    op.drop_index('ix_project_summaries_total_revenue', table_name='project_summaries')
+    op.drop_index('ix_project_summaries_probability', table_name='project_summaries')
+    op.drop_index('ix_project_summaries_last_activity_at', table_name='project_summaries')
+    op.drop_column('project_summaries', 'last_activity_at')
+    op.drop_column('project_summaries', 'probability')
+    # ### end Alembic commands ###
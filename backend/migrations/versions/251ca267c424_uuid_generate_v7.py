@@ -0,0 +1,55 @@
+"""uuid generate v7
+
+Revision ID: 251ca267c424
+Revises: 15968fd1da97
+Create Date: 2026-10-18 19:48:26.117039
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '251ca267c424'
+down_revision: Union[str, Sequence[str], None] = '15968fd1da97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# INFO: UUIDv7 на стороне БД для строк, которые вставляет сам SQL
+# (клонирование проекта), — как src.core.models.id.uuid7 в приложении.
+# В PostgreSQL 15 встроенной uuidv7() нет: первые 6 байт uuid4 заменяются
+# миллисекундами Unix-времени, биты 52-53 превращают версию 4 в 7.
+UUID7_FUNCTION = """
+CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(
+                    uuid_send(gen_random_uuid())
+                    PLACING substring(
+                        int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint)
+                        FROM 3
+                    )
+                    FROM 1 FOR 6
+                ),
+                52, 1
+            ),
+            53, 1
+        ),
+        'hex'
+    )::uuid
+$$ LANGUAGE sql VOLATILE;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(UUID7_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP FUNCTION IF EXISTS uuid_generate_v7()")
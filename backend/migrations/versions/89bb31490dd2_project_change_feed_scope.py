@@ -0,0 +1,112 @@
+"""project change feed scope
+
+Revision ID: 89bb31490dd2
+Revises: e18dc4a2fe25
+Create Date: 2026-10-18 21:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '89bb31490dd2'
+down_revision: Union[str, Sequence[str], None] = 'e18dc4a2fe25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# INFO: метка удаления помнит менеджера проекта — менеджер в ленте видит
+# только свои удаления
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_tombstone_write() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO project_tombstones (project_id, manager_id)
+        VALUES (OLD.oid, OLD.manager_id)
+        ON CONFLICT (project_id) DO UPDATE SET
+            manager_id = EXCLUDED.manager_id,
+            change_seq = nextval('project_change_seq'),
+            change_xid = pg_current_xact_id()::text::bigint,
+            deleted_at = now();
+    ELSE
+        DELETE FROM project_tombstones WHERE project_id = NEW.oid;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_tombstone_write() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO project_tombstones (project_id) VALUES (OLD.oid)
+        ON CONFLICT (project_id) DO UPDATE SET
+            change_seq = nextval('project_change_seq'),
+            change_xid = pg_current_xact_id()::text::bigint,
+            deleted_at = now();
+    ELSE
+        DELETE FROM project_tombstones WHERE project_id = NEW.oid;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# INFO: при передаче проекта другому менеджеру прежний получает событие
+# ухода из области; вернулся проект — событие для нового владельца лишнее
+SCOPE_EXIT_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_scope_exit_write() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO project_scope_exits (project_id, manager_id)
+    VALUES (OLD.oid, OLD.manager_id)
+    ON CONFLICT (project_id, manager_id) DO UPDATE SET
+        change_seq = nextval('project_change_seq'),
+        change_xid = pg_current_xact_id()::text::bigint,
+        left_at = now();
+    DELETE FROM project_scope_exits
+    WHERE project_id = NEW.oid AND manager_id = NEW.manager_id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('project_scope_exits',
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('manager_id', sa.UUID(), nullable=False),
+    sa.Column('change_seq', sa.BigInteger(), server_default=sa.text("nextval('project_change_seq')"), nullable=False),
+    sa.Column('change_xid', sa.BigInteger(), server_default=sa.text('(pg_current_xact_id()::text)::bigint'), nullable=False),
+    sa.Column('left_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('project_id', 'manager_id')
+    )
+    op.create_index('ix_project_scope_exits_manager_id_change_xid_change_seq', 'project_scope_exits', ['manager_id', 'change_xid', 'change_seq'], unique=False)
+    op.add_column('project_tombstones', sa.Column('manager_id', sa.UUID(), nullable=True))
+    op.create_index('ix_project_tombstones_manager_id_change_xid_change_seq', 'project_tombstones', ['manager_id', 'change_xid', 'change_seq'], unique=False)
+    # ### end Alembic commands ###
+    op.execute(TOMBSTONE_FUNCTION)
+    op.execute(SCOPE_EXIT_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER projects_scope_exit AFTER UPDATE OF manager_id ON projects "
+        "FOR EACH ROW WHEN (OLD.manager_id IS DISTINCT FROM NEW.manager_id) "
+        "EXECUTE FUNCTION project_scope_exit_write()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS projects_scope_exit ON projects")
+    op.execute("DROP FUNCTION IF EXISTS project_scope_exit_write()")
+    op.execute(PREVIOUS_TOMBSTONE_FUNCTION)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_project_tombstones_manager_id_change_xid_change_seq', table_name='project_tombstones')
+    op.drop_column('project_tombstones', 'manager_id')
+    op.drop_index('ix_project_scope_exits_manager_id_change_xid_change_seq', table_name='project_scope_exits')
+    op.drop_table('project_scope_exits')
+    # ### end Alembic commands ###
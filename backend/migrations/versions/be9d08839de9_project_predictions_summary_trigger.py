@@ -0,0 +1,37 @@
+"""project predictions summary trigger
+
+Revision ID: be9d08839de9
+Revises: bd1244ee46b1
+Create Date: 2026-10-18 14:26:51.903447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'be9d08839de9'
+down_revision: Union[str, Sequence[str], None] = 'bd1244ee46b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # INFO: прогнозы в сводке не считаются, но их изменение должно сдвигать
+    # project_summaries.refreshed_at — по нему строится ETag карточки.
+    op.execute(
+        "CREATE TRIGGER project_predictions_project_summary "
+        "AFTER INSERT OR UPDATE OR DELETE ON project_predictions "
+        "FOR EACH ROW EXECUTE FUNCTION project_summary_child_changed()"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "DROP TRIGGER IF EXISTS project_predictions_project_summary "
+        "ON project_predictions"
+    )
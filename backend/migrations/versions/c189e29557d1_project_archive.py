@@ -0,0 +1,131 @@
+"""project archive
+
+Revision ID: c189e29557d1
+Revises: b9eb8581e855
+Create Date: 2026-10-18 16:52:41.308214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c189e29557d1'
+down_revision: Union[str, Sequence[str], None] = 'b9eb8581e855'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# INFO: сводка архивного проекта заморожена на момент архивации: его
+# дочерних строк в БД больше нет, пересчёт обнулил бы итоги.
+REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_refresh(pids uuid[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (
+        project_id, total_revenue, total_costs, weighted_revenue,
+        last_stage_change_at, comments_count, refreshed_at
+    )
+    SELECT
+        p.oid,
+        f.revenue,
+        f.costs,
+        f.revenue * coalesce(p.probability, 0) / 100,
+        h.changed_at,
+        c.comments,
+        now()
+    FROM projects p
+    CROSS JOIN LATERAL (
+        SELECT coalesce(sum(revenue), 0) AS revenue, coalesce(sum(costs), 0) AS costs
+        FROM financial_periods WHERE project_id = p.oid
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys
+        WHERE project_id = p.oid AND field_changed = 'stage_id'
+    ) h
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS comments FROM comments WHERE project_id = p.oid
+    ) c
+    WHERE p.oid = ANY(pids) AND NOT p.is_archived
+    ON CONFLICT (project_id) DO UPDATE SET
+        total_revenue = EXCLUDED.total_revenue,
+        total_costs = EXCLUDED.total_costs,
+        weighted_revenue = EXCLUDED.weighted_revenue,
+        last_stage_change_at = EXCLUDED.last_stage_change_at,
+        comments_count = EXCLUDED.comments_count,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PREVIOUS_REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_refresh(pids uuid[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (
+        project_id, total_revenue, total_costs, weighted_revenue,
+        last_stage_change_at, comments_count, refreshed_at
+    )
+    SELECT
+        p.oid,
+        f.revenue,
+        f.costs,
+        f.revenue * coalesce(p.probability, 0) / 100,
+        h.changed_at,
+        c.comments,
+        now()
+    FROM projects p
+    CROSS JOIN LATERAL (
+        SELECT coalesce(sum(revenue), 0) AS revenue, coalesce(sum(costs), 0) AS costs
+        FROM financial_periods WHERE project_id = p.oid
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys
+        WHERE project_id = p.oid AND field_changed = 'stage_id'
+    ) h
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS comments FROM comments WHERE project_id = p.oid
+    ) c
+    WHERE p.oid = ANY(pids)
+    ON CONFLICT (project_id) DO UPDATE SET
+        total_revenue = EXCLUDED.total_revenue,
+        total_costs = EXCLUDED.total_costs,
+        weighted_revenue = EXCLUDED.weighted_revenue,
+        last_stage_change_at = EXCLUDED.last_stage_change_at,
+        comments_count = EXCLUDED.comments_count,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('project_archive_periods',
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.Column('costs', sa.Numeric(precision=15, scale=2), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.oid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id', 'year', 'month')
+    )
+    op.add_column('projects', sa.Column('is_archived', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    op.add_column('projects', sa.Column('archive_key', sa.String(length=255), nullable=True))
+    op.create_index('ix_projects_active_created_at_oid', 'projects', ['created_at', 'oid'], unique=False, postgresql_where=sa.text('NOT is_archived'))
+    # ### end Alembic commands ###
+    op.execute(REFRESH_FUNCTION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(PREVIOUS_REFRESH_FUNCTION)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_index('ix_projects_active_created_at_oid', table_name='projects', postgresql_where=sa.text('NOT is_archived'))
+    op.drop_column('projects', 'archive_key')
+    op.drop_column('projects', 'is_archived')
+    op.drop_table('project_archive_periods')
+    # ### end Alembic commands ###
@@ -0,0 +1,132 @@
+"""project summaries
+
+Revision ID: fe519a7f5579
+Revises: f17db8d77676
+Create Date: 2026-10-18 13:02:37.481296
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fe519a7f5579'
+down_revision: Union[str, Sequence[str], None] = 'f17db8d77676'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# INFO: сводка пересчитывается целиком для переданных проектов: так один и тот
+# же код служит и триггерам (один проект), и полной пересборке (пачки oid).
+REFRESH_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_refresh(pids uuid[]) RETURNS void AS $$
+BEGIN
+    INSERT INTO project_summaries AS s (
+        project_id, total_revenue, total_costs, weighted_revenue,
+        last_stage_change_at, comments_count, refreshed_at
+    )
+    SELECT
+        p.oid,
+        f.revenue,
+        f.costs,
+        f.revenue * coalesce(p.probability, 0) / 100,
+        h.changed_at,
+        c.comments,
+        now()
+    FROM projects p
+    CROSS JOIN LATERAL (
+        SELECT coalesce(sum(revenue), 0) AS revenue, coalesce(sum(costs), 0) AS costs
+        FROM financial_periods WHERE project_id = p.oid
+    ) f
+    CROSS JOIN LATERAL (
+        SELECT max(changed_at) AS changed_at
+        FROM project_historys
+        WHERE project_id = p.oid AND field_changed = 'stage_id'
+    ) h
+    CROSS JOIN LATERAL (
+        SELECT count(*) AS comments FROM comments WHERE project_id = p.oid
+    ) c
+    WHERE p.oid = ANY(pids)
+    ON CONFLICT (project_id) DO UPDATE SET
+        total_revenue = EXCLUDED.total_revenue,
+        total_costs = EXCLUDED.total_costs,
+        weighted_revenue = EXCLUDED.weighted_revenue,
+        last_stage_change_at = EXCLUDED.last_stage_change_at,
+        comments_count = EXCLUDED.comments_count,
+        refreshed_at = EXCLUDED.refreshed_at;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CHILD_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_child_changed() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM project_summary_refresh(ARRAY[NEW.project_id]);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM project_summary_refresh(ARRAY[OLD.project_id]);
+    ELSE
+        PERFORM project_summary_refresh(ARRAY[OLD.project_id, NEW.project_id]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+PROJECT_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION project_summary_project_changed() RETURNS trigger AS $$
+BEGIN
+    PERFORM project_summary_refresh(ARRAY[NEW.oid]);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+CHILD_TABLES = ('financial_periods', 'comments', 'project_historys')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('project_summaries',
+    sa.Column('project_id', sa.UUID(), nullable=False),
+    sa.Column('total_revenue', sa.Numeric(precision=15, scale=2), server_default='0', nullable=False),
+    sa.Column('total_costs', sa.Numeric(precision=15, scale=2), server_default='0', nullable=False),
+    sa.Column('weighted_revenue', sa.Numeric(precision=15, scale=2), server_default='0', nullable=False),
+    sa.Column('last_stage_change_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('refreshed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.oid'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    # ### end Alembic commands ###
+    op.execute(REFRESH_FUNCTION)
+    op.execute(CHILD_TRIGGER_FUNCTION)
+    op.execute(PROJECT_TRIGGER_FUNCTION)
+    for table in CHILD_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_project_summary "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION project_summary_child_changed()"
+        )
+    op.execute(
+        "CREATE TRIGGER projects_project_summary "
+        "AFTER INSERT OR UPDATE OF stage_id, probability ON projects "
+        "FOR EACH ROW EXECUTE FUNCTION project_summary_project_changed()"
+    )
+    op.execute("SELECT project_summary_refresh(array(SELECT oid FROM projects))")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS projects_project_summary ON projects")
+    for table in CHILD_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_project_summary ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS project_summary_project_changed()")
+    op.execute("DROP FUNCTION IF EXISTS project_summary_child_changed()")
+    op.execute("DROP FUNCTION IF EXISTS project_summary_refresh(uuid[])")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('project_summaries')
+    # ### end Alembic commands ###
@@ -12,6 +12,7 @@ from src.auth.schemas import (
 )
 from src.core.auth.current import DepCurrentUser
 from src.core.auth.dto import TokenRefreshDict
+from src.core.models.id import uuid7
 from src.core.models.role import Role
 from src.dependency import DepJwtHandler, DepPasswordHasher, DepTokenRep, DepUserRep
 from src.core.auth.models import User
@@ -49,7 +50,7 @@ async def registery(
         raise ResourceAlreadyExistsError()
     log.debug(f"Пароль пользователя: {user.password}")
     password = hasher.hash_password(user.password)
-    user_id = uuid.uuid4()
+    user_id = uuid7()
     model = User(
         oid=user_id,
         email=user.email,
@@ -57,7 +58,7 @@ async def registery(
         created_at=datetime.now(timezone.utc),
         update_at=None,
     )
-    refresh_token_jti = uuid.uuid4()
+    refresh_token_jti = uuid7()
 
     resp = await user_repo.add(model)
     refresh_token, expired_at = jwt_handler.create_refresh_token(
@@ -110,7 +111,7 @@ async def login_user(
     if not hasher.verify_password(form.password, user.password):
         raise InvalidInputError()
 
-    refresh_token_jti = uuid.uuid4()
+    refresh_token_jti = uuid7()
 
     refresh_token, expired_at = jwt_handler.create_refresh_token(
         str(user.oid), str(refresh_token_jti)
@@ -161,7 +162,7 @@ async def refresh_token(
         if not user:
             raise UserNotFoundError()
         await token_repo.delete(jti)
-        new_jti = str(uuid.uuid4())
+        new_jti = str(uuid7())
         new_refresh_token, expired_at = jwt_handler.create_refresh_token(
             str(user_id),
             new_jti,
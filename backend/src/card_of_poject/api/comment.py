@@ -1,14 +1,13 @@
 __all__ = ["router"]
 from datetime import datetime, timezone
 from typing import List
-from uuid import uuid4
 from uuid import UUID as PyUUID
 from fastapi import APIRouter
 from src.card_of_poject.model import Comment
 from src.card_of_poject.schemas.comment import CommentCreate, CommentResponse
 from src.core.auth.current import DepCurrentUser
 from src.core.exceptions import InsufficientPermissionsError, ResourceNotFoundError
-from src.core.models.role import Role
+from src.core.models.id import uuid7
 from src.dependency import DepCommentRep, DepProjectRep
 
 
@@ -25,13 +24,12 @@ async def create_comment(
     user_data: DepCurrentUser,
     project_repo: DepProjectRep,
 ):
-    user_oid, user_role = user_data
-    project = await project_repo.get(comment.project_id)
-    if user_role == Role.MANAGER and project.manager_id != user_oid:
-        raise InsufficientPermissionsError()
-    if not project:
+    access = await project_repo.scope_to(*user_data).can_access(comment.project_id)
+    if access is None:
         raise ResourceNotFoundError()
-    oid = uuid4()
+    if not access:
+        raise InsufficientPermissionsError()
+    oid = uuid7()
 
     comment_data = Comment(
         oid=oid,
@@ -49,12 +47,10 @@ async def list_comments(
     user_data: DepCurrentUser,
     project_repo: DepProjectRep,
 ):
-    user_oid, user_role = user_data
-
-    project = await project_repo.get(project_id)
-    if not project:
+    access = await project_repo.scope_to(*user_data).can_access(project_id)
+    if access is None:
         raise ResourceNotFoundError()
-    if user_role == Role.MANAGER and project.manager_id != user_oid:
+    if not access:
         raise InsufficientPermissionsError()
     comments = await comment_repo.list_for_project(project_id)
     return comments
@@ -67,13 +63,10 @@ async def delete_comment(
     user_data: DepCurrentUser,
     project_repo: DepProjectRep,
 ):
-    user_oid, user_role = user_data
-
     comment = await comment_repo.get(comment_id)
     if not comment:
         raise ResourceNotFoundError()
-    project = await project_repo.get(comment.project_id)
-    if user_role == Role.MANAGER and project.manager_id != user_oid:
+    if not await project_repo.scope_to(*user_data).can_access(comment.project_id):
         raise InsufficientPermissionsError()
     await comment_repo.delete(comment_id)
     return {"message": "Comment deleted"}
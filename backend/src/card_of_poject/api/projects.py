@@ -1,26 +1,194 @@
 __all__ = ["router"]
-from fastapi import APIRouter
+import csv
+import io
+from decimal import Decimal
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Header,
+    Query,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
+from src.card_of_poject.archive import restore_project
 from src.card_of_poject.model import Project
+from src.card_of_poject.organizations import (
+    ORGANIZATION_SUGGEST_LIMIT,
+    invalidate_organizations,
+    suggest_organizations,
+)
+from src.card_of_poject.project_import import import_projects, read_rows
+from src.card_of_poject.purge import (
+    PURGE_THRESHOLD,
+    get_purge_job,
+    run_purge,
+    start_purge,
+)
+from src.card_of_poject.repository.project import (
+    PROJECT_EXPANDABLE,
+    PROJECT_SORTS,
+    ProjectRepository,
+)
+from src.card_of_poject.schemas.comment import CommentPageResponse
+from src.card_of_poject.schemas.history import ProjectHistoryPageResponse
+from src.card_of_poject.schemas.prediction import ProjectPredictionPageResponse
 from src.card_of_poject.schemas.project import (
     AnalyticsResponse,
+    OrganizationSuggestion,
+    ProjectChangesResponse,
+    ProjectBulkCreate,
+    ProjectBulkResponse,
+    ProjectBulkUpdate,
+    ProjectChildTotals,
+    ProjectCloneRequest,
     ProjectCreate,
+    ProjectDuplicate,
+    ProjectFacetsResponse,
+    ProjectImportResponse,
+    ProjectPageResponse,
     ProjectRegistryResponse,
     ProjectResponse,
+    ProjectSearchResponse,
     ProjectUpdate,
+    PurgeJobResponse,
 )
 from src.core.auth.current import DepCurrentUser
 
-from uuid import UUID as PyUUID, uuid4
-from typing import List, Optional
+from uuid import UUID as PyUUID
+from typing import Annotated, AsyncIterator, List, Literal, Optional, Tuple
 from datetime import datetime, timezone
 
-from src.core.exceptions import InsufficientPermissionsError, ResourceNotFoundError
+from src.core.etag import etag_matches, make_etag
+from src.core.pagination import decode_cursor, encode_cursor
+from src.core.exceptions import (
+    InsufficientPermissionsError,
+    InvalidInputError,
+    ResourceConflictError,
+    ResourceNotFoundError,
+)
+from src.core.models.id import uuid7
 from src.core.models.role import Role
-from src.dependency import DepProjectRep, DepStageRep
+from src.database import session_maker
+from src.dependency import (
+    DepCommentRep,
+    DepProjectHistoryRep,
+    DepProjectPredictionRep,
+    DepPrivateMinioHand,
+    DepProjectRep,
+    DepStageRep,
+)
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
 
+def _parse_expand(expand: Optional[str]) -> List[str]:
+    """`history,comments` → ["history", "comments"]."""
+    if not expand:
+        return []
+    return [name.strip() for name in expand.split(",") if name.strip()]
+
+
+async def _check_access(
+    project_repo: ProjectRepository, user_data: Tuple[PyUUID, int], project_id: PyUUID
+) -> None:
+    """Проект в области пользователя (`ProjectRepository.scope_to`).
+
+    Raises:
+        ResourceNotFoundError: проекта нет
+        InsufficientPermissionsError: проект чужого менеджера
+    """
+    visible = await project_repo.scope_to(*user_data).can_access(project_id)
+    if visible is None:
+        raise ResourceNotFoundError()
+    if not visible:
+        raise InsufficientPermissionsError()
+
+
+def _parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """`If-Match: "3"` → 3 (версия проекта из списка), ETag карточки
+    `W/"3-..."` → 3. `If-Match: *` — любая версия, без проверки."""
+    if not if_match or if_match.strip() == "*":
+        return None
+    try:
+        tag = if_match.strip().removeprefix("W/").strip('"')
+        return int(tag.split("-", 1)[0])
+    except ValueError:
+        raise InvalidInputError()
+
+
+async def get_project_filters(
+    stage_id: List[PyUUID] = Query([]),
+    manager_id: List[PyUUID] = Query([]),
+    business_segment_id: List[PyUUID] = Query([]),
+    service_id: List[PyUUID] = Query([]),
+    implementation_year_from: Optional[int] = None,
+    implementation_year_to: Optional[int] = None,
+    probability_from: Optional[Decimal] = Query(None, ge=0, le=100),
+    probability_to: Optional[Decimal] = Query(None, ge=0, le=100),
+    is_industry_solution: Optional[bool] = None,
+    is_forecast_accepted: Optional[bool] = None,
+    is_dzo_implementation: Optional[bool] = None,
+    requires_management_control: Optional[bool] = None,
+    is_archived: Optional[bool] = Query(
+        False, description="По умолчанию архивные проекты не показываются"
+    ),
+) -> dict:
+    """Фильтры списка из query: `?stage_id=a&stage_id=b&probability_from=50`.
+
+    Возвращает только заданные значения — в формате `ProjectRepository._apply_filters`.
+    """
+    filters = dict(locals())
+    return {k: v for k, v in filters.items() if v is not None and v != []}
+
+
+DepProjectFilters = Annotated[dict, Depends(get_project_filters)]
+
+
+REGISTRY_EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+REGISTRY_EXPORT_CHUNK = 500
+
+
+async def _stream_registry(
+    export_format: str,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    user_data: Tuple[PyUUID, int],
+) -> AsyncIterator[str]:
+    # INFO: сессия из зависимости закрывается до отправки тела ответа,
+    # поэтому генератор открывает свою и держит её, пока читает курсор.
+    fields = list(ProjectRegistryResponse.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(fields)
+    async with session_maker() as session:
+        project_repo = ProjectRepository(session, model=Project).scope_to(*user_data)
+        rows = 0
+        async for row in project_repo.stream_project_registry(
+            start_date, end_date, batch_size=REGISTRY_EXPORT_CHUNK
+        ):
+            item = ProjectRegistryResponse.model_validate(row)
+            if export_format == "csv":
+                values = item.model_dump()
+                values["changes"] = "; ".join(item.changes)
+                writer.writerow(values[field] for field in fields)
+            else:
+                buffer.write(item.model_dump_json())
+                buffer.write("\n")
+            rows += 1
+            if rows % REGISTRY_EXPORT_CHUNK == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    yield buffer.getvalue()
+
+
 @router.post(
     "/",
     response_model=ProjectResponse,
@@ -37,15 +205,224 @@ async def create_project(
     stage = await stage_repo.get(project.stage_id)
     if not stage:
         raise ResourceNotFoundError()
-    oid = uuid4()
+    # INFO: дубли не запрещают создание — они возвращаются в ответе,
+    # чтобы форма предложила открыть существующий проект
+    duplicates = await project_repo.find_duplicates([project.model_dump()])
+    oid = uuid7()
     project_data = Project(
         oid=oid,
-        **project.model_validate(),
+        **project.model_dump(),
         created_at=datetime.now(timezone.utc),
     )
     project_data.probability = stage.probability
     created_project = await project_repo.add(project_data)
-    return created_project
+    invalidate_organizations()
+    card = ProjectResponse.model_validate(
+        await project_repo.get_card(created_project.oid)
+    )
+    card.duplicates = [
+        ProjectDuplicate.model_validate(row) for row in duplicates.get(0, [])
+    ]
+    return card
+
+
+@router.post(
+    "/bulk",
+    response_model=ProjectBulkResponse,
+    description="Создание пачки проектов одним INSERT. Результат — по каждому элементу.",
+)
+async def bulk_create_projects(
+    payload: ProjectBulkCreate,
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+):
+    user_id, user_role = user_data
+    if user_role != Role.ADMIN:
+        raise InsufficientPermissionsError()
+    items = [item.model_dump() for item in payload.items]
+    results = await project_repo.bulk_create(items)
+    invalidate_organizations()
+    return {"items": results}
+
+
+@router.patch(
+    "/bulk",
+    response_model=ProjectBulkResponse,
+    description="Частичное обновление пачки проектов. Результат — по каждому элементу.",
+)
+async def bulk_update_projects(
+    payload: ProjectBulkUpdate,
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+):
+    user_id, user_role = user_data
+    if user_role == Role.USER:
+        raise InsufficientPermissionsError()
+    items = [item.model_dump(exclude_unset=True) for item in payload.items]
+    results = await project_repo.bulk_update(items)
+    invalidate_organizations()
+    return {"items": results}
+
+
+@router.post(
+    "/import",
+    response_model=ProjectImportResponse,
+    description="Импорт проектов из CSV/XLSX. Колонки — поля проекта; "
+    "справочники задаются названиями: stage, service, business_segment, "
+    "payment_type, accepted_for_evaluation, manager (email).",
+)
+async def import_projects_file(
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    file: UploadFile = File(),
+):
+    user_id, user_role = user_data
+    if user_role != Role.ADMIN:
+        raise InsufficientPermissionsError()
+    report = await import_projects(read_rows(file.file, file.filename), project_repo)
+    invalidate_organizations()
+    return report
+
+
+# INFO: статические пути объявлены раньше "/{project_id}", иначе он их перехватывает.
+@router.get(
+    "/registry",
+    response_model=List[ProjectRegistryResponse],
+)
+async def get_project_registry(
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    project_repo.scope_to(*user_data)
+    registry = await project_repo.get_project_registry(start_date, end_date)
+    return registry
+
+
+@router.get(
+    "/registry/export",
+    description="Реестр целиком файлом CSV или NDJSON, отдаётся потоком.",
+)
+async def export_project_registry(
+    user_data: DepCurrentUser,
+    format: Literal["csv", "ndjson"] = "csv",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    return StreamingResponse(
+        _stream_registry(format, start_date, end_date, user_data),
+        media_type=REGISTRY_EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="registry.{format}"'
+        },
+    )
+
+
+@router.get(
+    "/search",
+    response_model=ProjectSearchResponse,
+)
+async def search_projects(
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    filters: DepProjectFilters,
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+):
+    project_repo.scope_to(*user_data)
+    items = await project_repo.search(q, filters, limit=limit, offset=offset)
+    return {"items": items, "limit": limit, "offset": offset}
+
+
+@router.get(
+    "/organizations/suggest",
+    response_model=List[OrganizationSuggestion],
+    description="Подсказки для формы проекта: организации, название или ИНН "
+    "которых начинается с `prefix`, самые частые первыми.",
+)
+async def suggest_project_organizations(
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(ORGANIZATION_SUGGEST_LIMIT, ge=1, le=ORGANIZATION_SUGGEST_LIMIT),
+):
+    return await suggest_organizations(project_repo, prefix, limit)
+
+
+@router.get(
+    "/facets",
+    response_model=ProjectFacetsResponse,
+    description="Количество проектов по этапам, менеджерам, сегментам и "
+    "услугам с учётом тех же фильтров, что и у списка.",
+)
+async def get_project_facets(
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    filters: DepProjectFilters,
+):
+    return await project_repo.scope_to(*user_data).facets(filters)
+
+
+@router.get(
+    "/changes",
+    response_model=ProjectChangesResponse,
+    description="Дельта для локальной копии списка: изменённые и удалённые "
+    "проекты, а для менеджера ещё и переданные другому (`left_scope`), после "
+    "`cursor`. Без `cursor` — всё с начала; пока `has_more`, "
+    "запрашивать дальше с полученным `cursor`.",
+)
+async def get_project_changes(
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=2000),
+):
+    # курсор — ключ (change_xid, change_seq) последнего отданного изменения
+    since = decode_cursor(cursor, [int, int]) if cursor else (0, 0)
+    project_repo.scope_to(*user_data)
+    items, deleted, left, since, has_more = await project_repo.changes(since, limit)
+    return {
+        "items": items,
+        "deleted": [row.project_id for row in deleted],
+        "left_scope": [row.project_id for row in left],
+        "cursor": encode_cursor(since),
+        "has_more": has_more,
+    }
+
+
+@router.get(
+    "/purge-jobs/{job_id}",
+    response_model=PurgeJobResponse,
+)
+async def get_project_purge_job(
+    job_id: PyUUID,
+    user_data: DepCurrentUser,
+):
+    # задачи удаления видят те, кто может удалять проекты
+    user_id, user_role = user_data
+    if user_role == Role.USER:
+        raise InsufficientPermissionsError()
+    job = get_purge_job(job_id)
+    if not job:
+        raise ResourceNotFoundError()
+    return job
+
+
+@router.get(
+    "/analytics",
+    response_model=AnalyticsResponse,
+)
+async def get_analytics(
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    project_repo.scope_to(*user_data)
+    analytics = await project_repo.get_analytics(start_date, end_date)
+    return analytics
 
 
 @router.get(
@@ -56,110 +433,251 @@ async def get_project(
     project_id: PyUUID,
     user_data: DepCurrentUser,
     project_repo: DepProjectRep,
+    response: Response,
+    expand: Optional[str] = Query(
+        None,
+        description="Через запятую: " + ",".join(PROJECT_EXPANDABLE),
+    ),
+    if_none_match: Optional[str] = Header(None),
 ):
+    expand_names = _parse_expand(expand)
+    await _check_access(project_repo, user_data, project_id)
+    version = await project_repo.card_version(project_id)
+    if not version:
+        raise ResourceNotFoundError()
+    etag = make_etag(
+        project_id, *version, *sorted(set(expand_names)), version=version.version
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
 
-    project = await project_repo.get(project_id)
+    project = await project_repo.get_card(project_id, expand_names)
     if not project:
         raise ResourceNotFoundError()
-    return project
+    response.headers["ETag"] = etag
+    card = ProjectResponse.model_validate(project)
+    card.totals = ProjectChildTotals.model_validate(
+        await project_repo.count_children(project_id)
+    )
+    card.links = {
+        name: f"{router.prefix}/{project_id}/{name}"
+        for name in ("history", "comments", "predictions")
+    }
+    return card
 
 
-@router.put(
-    "/{project_id}",
+@router.get(
+    "/{project_id}/history",
+    response_model=ProjectHistoryPageResponse,
+)
+async def list_project_history(
+    project_id: PyUUID,
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    history_repo: DepProjectHistoryRep,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    await _check_access(project_repo, user_data, project_id)
+    items, next_cursor = await history_repo.list_page(project_id, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/{project_id}/comments",
+    response_model=CommentPageResponse,
+)
+async def list_project_comments(
+    project_id: PyUUID,
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    comment_repo: DepCommentRep,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    await _check_access(project_repo, user_data, project_id)
+    items, next_cursor = await comment_repo.list_page(project_id, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/{project_id}/predictions",
+    response_model=ProjectPredictionPageResponse,
+)
+async def list_project_predictions(
+    project_id: PyUUID,
+    user_data: DepCurrentUser,
+    project_repo: DepProjectRep,
+    prediction_repo: DepProjectPredictionRep,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    await _check_access(project_repo, user_data, project_id)
+    items, next_cursor = await prediction_repo.list_page(project_id, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.post(
+    "/{project_id}/clone",
     response_model=ProjectResponse,
+    status_code=201,
+    description="Новый проект по образцу существующего: проект и выбранные "
+    "дочерние строки копируются в БД одним запросом. Номер проекта не "
+    "копируется.",
 )
-async def update_project(
+async def clone_project(
     project_id: PyUUID,
     user_data: DepCurrentUser,
-    project: ProjectUpdate,
     project_repo: DepProjectRep,
-    stage_repo: DepStageRep,
+    options: ProjectCloneRequest = ProjectCloneRequest(),
 ):
     user_id, user_role = user_data
-    if user_role == Role.USER:
+    # INFO: копия — новый проект, поэтому правило то же, что у создания
+    if user_role != Role.ADMIN:
         raise InsufficientPermissionsError()
-
-    existing_project = await project_repo.get(project_id)
-    if not existing_project:
+    await _check_access(project_repo, user_data, project_id)
+    state = await project_repo.archive_state(project_id)
+    if not state:
         raise ResourceNotFoundError()
-    update_data = project.model_dump(exclude_unset=True)
-    if "stage_id" in update_data:
-        stage = await stage_repo.get(update_data["stage_id"])
-        if not stage:
-            raise ResourceNotFoundError()
-        update_data["probability"] = stage.probability
-    for key, value in update_data.items():
-        setattr(existing_project, key, value)
-    update_data["update_at"] = datetime.now(timezone.utc)
-    updated_project = await project_repo.add(existing_project)
-    return updated_project
-
-
-@router.delete("/{project_id}")
-async def delete_project(
+    if state.is_archived:
+        # INFO: у заглушки нет дочерних строк — сначала /restore
+        raise ResourceConflictError()
+    oid = await project_repo.clone(project_id, **options.model_dump())
+    if not oid:
+        # проект на месте, значит не найден новый менеджер
+        raise InvalidInputError()
+    invalidate_organizations()
+    return await project_repo.get_card(oid)
+
+
+@router.post(
+    "/{project_id}/restore",
+    response_model=ProjectResponse,
+    description="Возвращает архивный проект в рабочие таблицы. "
+    "Для проекта не из архива ничего не делает.",
+)
+async def restore_archived_project(
     project_id: PyUUID,
     user_data: DepCurrentUser,
     project_repo: DepProjectRep,
+    storage: DepPrivateMinioHand,
 ):
     user_id, user_role = user_data
     if user_role == Role.USER:
         raise InsufficientPermissionsError()
-    project = await project_repo.get(project_id)
-    if not project:
+    await _check_access(project_repo, user_data, project_id)
+    state = await project_repo.archive_state(project_id)
+    if not state:
         raise ResourceNotFoundError()
-    await project_repo.delete(project_id)
-    return {"message": "Project deleted"}
+    if state.is_archived:
+        await restore_project(project_repo, storage, project_id)
+    return await project_repo.get_card(project_id)
 
 
-@router.get(
-    "/",
-    response_model=List[ProjectResponse],
+@router.put(
+    "/{project_id}",
+    response_model=ProjectResponse,
 )
-async def list_projects(
+async def update_project(
+    project_id: PyUUID,
+    user_data: DepCurrentUser,
+    project: ProjectUpdate,
     project_repo: DepProjectRep,
-    stage_id: Optional[PyUUID] = None,
-    manager_id: Optional[PyUUID] = None,
-    business_segment_id: Optional[PyUUID] = None,
-    service_id: Optional[PyUUID] = None,
+    if_match: Optional[str] = Header(
+        None, description="Версия проекта или ETag карточки; при несовпадении — 409"
+    ),
 ):
-    filters = {}
-    if stage_id:
-        filters["stage_id"] = stage_id
-    if manager_id:
-        filters["manager_id"] = manager_id
-    if business_segment_id:
-        filters["business_segment_id"] = business_segment_id
-    if service_id:
-        filters["service_id"] = service_id
-    projects = await project_repo.list(filters)
-    return projects
+    user_id, user_role = user_data
+    if user_role == Role.USER:
+        raise InsufficientPermissionsError()
+    await _check_access(project_repo, user_data, project_id)
 
+    # проект и этап (если меняется) проверяются самим UPDATE
+    updated = await project_repo.patch(
+        project_id,
+        project.model_dump(exclude_unset=True),
+        version=_parse_if_match(if_match),
+    )
+    if not updated:
+        raise ResourceNotFoundError()
+    invalidate_organizations()
+    return await project_repo.get_card(project_id)
 
-@router.get(
-    "/registry",
-    response_model=List[ProjectRegistryResponse],
+
+@router.delete(
+    "/{project_id}",
+    description="Проект удаляется одним DELETE вместе с дочерними строками. "
+    "Очень большой проект очищается фоновой задачей: ответ 202 и задача, "
+    "прогресс которой — в GET /projects/purge-jobs/{oid}.",
 )
-async def get_project_registry(
+async def delete_project(
+    project_id: PyUUID,
     user_data: DepCurrentUser,
     project_repo: DepProjectRep,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
+    response: Response,
+    background_tasks: BackgroundTasks,
 ):
-
-    registry = await project_repo.get_project_registry(start_date, end_date)
-    return registry
+    user_id, user_role = user_data
+    if user_role == Role.USER:
+        raise InsufficientPermissionsError()
+    await _check_access(project_repo, user_data, project_id)
+    total = sum(await project_repo.count_children(project_id))
+    if total > PURGE_THRESHOLD:
+        job, created = start_purge(project_id, total)
+        if created:
+            background_tasks.add_task(run_purge, job)
+        response.status_code = 202
+        return {
+            "message": "Project deletion started",
+            "job": PurgeJobResponse.model_validate(job),
+        }
+    if not await project_repo.delete(project_id):
+        raise ResourceNotFoundError()
+    invalidate_organizations()
+    return {"message": "Project deleted"}
 
 
 @router.get(
-    "/analytics",
-    response_model=AnalyticsResponse,
+    "/",
+    response_model=ProjectPageResponse,
+    description="Список проектов, по умолчанию от новых к старым. "
+    "Следующая страница запрашивается с `cursor=next_cursor` и тем же `sort`.",
 )
-async def get_analytics(
+async def list_projects(
     user_data: DepCurrentUser,
     project_repo: DepProjectRep,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
+    filters: DepProjectFilters,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    sort: str = Query(
+        "-created_at",
+        pattern=f"^-?({'|'.join(PROJECT_SORTS)})$",
+        description="Поле сортировки, `-` в начале — по убыванию: "
+        + ", ".join(PROJECT_SORTS),
+    ),
+    if_none_match: Optional[str] = Header(None),
 ):
-
-    analytics = await project_repo.get_analytics(start_date, end_date)
-    return analytics
+    project_repo.scope_to(*user_data)
+    projects, next_cursor = await project_repo.list_page(
+        filters,
+        limit,
+        cursor,
+        sort=sort.removeprefix("-"),
+        descending=sort.startswith("-"),
+    )
+    # INFO: ETag — по строкам самой страницы: любая правка строки меняет её
+    # change_seq, а появление или уход строки — набор oid. Отдельного
+    # агрегата по всей выборке не нужно; 304 экономит сериализацию и трафик.
+    etag = make_etag(
+        sorted(filters.items()),
+        project_repo.manager_scope,
+        sort,
+        limit,
+        cursor,
+        *((row.oid, row.change_seq) for row in projects),
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {"items": projects, "next_cursor": next_cursor}
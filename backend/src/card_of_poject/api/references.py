@@ -2,7 +2,7 @@ __all__ = ["router"]
 from fastapi import APIRouter
 
 
-from uuid import UUID as PyUUID, uuid4
+from uuid import UUID as PyUUID
 from typing import List
 
 from src.card_of_poject.model import (
@@ -17,6 +17,7 @@ from src.card_of_poject.model import (
 )
 
 from src.card_of_poject.repository.references import ServiceRepository
+from src.core.models.id import uuid7
 from src.card_of_poject.schemas.references import (
     BusinessSegmentCreate,
     BusinessSegmentResponse,
@@ -76,7 +77,7 @@ async def create_stage(
         raise InsufficientPermissionsError()
     if await repo_stage.get_by_name(stage.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     log.debug(f"Creating stage {stage.model_dump()},\n")
     stage_data = Stage(oid=oid, **stage.model_dump())
     created_stage = await repo_stage.add(stage_data)
@@ -146,7 +147,7 @@ async def create_service(
 
     if await repo_service.get_by_name(service.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     service_data = Service(oid=oid, **service.model_dump())
     return await repo_service.add(service_data)
 
@@ -217,7 +218,7 @@ async def create_payment_type(
         raise InsufficientPermissionsError()
     if await repo_payment.get_by_name(payment.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     payment_data = PaymentType(oid=oid, **payment.model_dump())
     return await repo_payment.add(payment_data)
 
@@ -285,7 +286,7 @@ async def create_business_segment(
         raise InsufficientPermissionsError()
     if await repo_segment.get_by_name(segment.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     segment_data = BusinessSegment(oid=oid, **segment.model_dump())
     return await repo_segment.add(segment_data)
 
@@ -353,7 +354,7 @@ async def create_evaluation_type(
         raise InsufficientPermissionsError()
     if await repo_evaluation.get_by_name(evaluation.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     evaluation_data = EvaluationType(oid=oid, **evaluation.model_dump())
     return await repo_evaluation.add(evaluation_data)
 
@@ -426,7 +427,7 @@ async def create_cost_type(
         raise InsufficientPermissionsError()
     if await repo_cost.get_by_name(cost.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     cost_data = CostType(oid=oid, **cost.model_dump())
     return await repo_cost.add(cost_data)
 
@@ -490,7 +491,7 @@ async def create_revenue_status(
         raise InsufficientPermissionsError()
     if await repo_status.get_by_name(status.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     status_data = RevenueStatus(oid=oid, **status.model_dump())
     return await repo_status.add(status_data)
 
@@ -561,7 +562,7 @@ async def create_cost_status(
         raise InsufficientPermissionsError()
     if await repo_status.get_by_name(status.name):
         raise ResourceAlreadyExistsError()
-    oid = uuid4()
+    oid = uuid7()
     status_data = CostStatus(oid=oid, **status.model_dump())
     return await repo_status.add(status_data)
 
@@ -0,0 +1,177 @@
+__all__ = [
+    "ARCHIVE_BATCH_SIZE",
+    "archive_key",
+    "archive_project",
+    "restore_project",
+    "archive_projects",
+]
+import io
+from asyncio import to_thread
+from typing import Dict, List, Optional
+from uuid import UUID as PyUUID
+
+from sqlalchemy import Uuid
+from structlog import get_logger
+
+from src.card_of_poject.model import (
+    Comment,
+    FinancialPeriod,
+    Project,
+    ProjectHistory,
+    ProjectPrediction,
+)
+from src.card_of_poject.repository.project import ProjectRepository
+from src.core.minio.handler import MinioHandler
+
+log = get_logger(__name__)
+
+# INFO: архив проекта — один Parquet-объект в приватном бакете. В нём одна
+# строка: колонка на таблицу (`project`, `financial_periods`, ...) со
+# списком её строк. zstd сжимает однотипные строки истории и периодов
+# в разы лучше JSON.
+ARCHIVE_PREFIX = "archive/projects"
+ARCHIVE_COMPRESSION = "zstd"
+ARCHIVE_BATCH_SIZE = 100
+
+_TABLES = {
+    "project": Project,
+    "financial_periods": FinancialPeriod,
+    "history": ProjectHistory,
+    "comments": Comment,
+    "predictions": ProjectPrediction,
+}
+
+
+def archive_key(project_id: PyUUID) -> str:
+    return f"{ARCHIVE_PREFIX}/{project_id}.parquet"
+
+
+def _uuid_columns(model) -> List[str]:
+    return [c.key for c in model.__table__.c if isinstance(c.type, Uuid)]
+
+
+def _to_parquet(data: Dict[str, List[dict]]) -> bytes:
+    # INFO: pyarrow нужен только архиву, поэтому импортируется здесь.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # UUID pyarrow не знает — в файле он строкой
+    document = {}
+    for name, model in _TABLES.items():
+        uuids = _uuid_columns(model)
+        document[name] = [
+            {k: str(v) if k in uuids and v is not None else v for k, v in row.items()}
+            for row in data[name]
+        ]
+    buffer = io.BytesIO()
+    pq.write_table(
+        pa.Table.from_pylist([document]), buffer, compression=ARCHIVE_COMPRESSION
+    )
+    return buffer.getvalue()
+
+
+def _from_parquet(raw: bytes) -> Dict[str, List[dict]]:
+    import pyarrow.parquet as pq
+
+    document = pq.read_table(io.BytesIO(raw)).to_pylist()[0]
+    data = {}
+    for name, model in _TABLES.items():
+        uuids = _uuid_columns(model)
+        data[name] = [
+            {k: PyUUID(v) if k in uuids and v is not None else v for k, v in row.items()}
+            for row in document[name] or []
+        ]
+    return data
+
+
+async def archive_project(
+    project_repo: ProjectRepository, storage: MinioHandler, project_id: PyUUID
+) -> bool:
+    """Выгружает проект в Parquet и оставляет в БД заглушку.
+
+    Всё происходит в одной транзакции под блокировкой проекта: объект
+    записывается до фиксации, так что при сбое данные остаются в БД, а
+    недописанный объект перезапишет следующий запуск.
+
+    Returns:
+        False, если проекта нет или он уже в архиве.
+    """
+    state = await project_repo.archive_state(project_id, lock=True)
+    if state is None or state.is_archived:
+        await project_repo.session.rollback()
+        return False
+    key = archive_key(project_id)
+    try:
+        data = await project_repo.export_archive(project_id)
+        raw = _to_parquet(data)
+        await to_thread(storage.upload_file, key, raw, len(raw))
+        await project_repo.archive_stub(project_id, key)
+    except Exception:
+        await project_repo.session.rollback()
+        raise
+    log.info(
+        "Проект в архиве",
+        project_id=str(project_id),
+        rows=sum(map(len, data.values())) - 1,
+        size=len(raw),
+    )
+    return True
+
+
+async def restore_project(
+    project_repo: ProjectRepository, storage: MinioHandler, project_id: PyUUID
+) -> bool:
+    """Загружает проект из архива обратно в БД и удаляет объект.
+
+    Returns:
+        False, если проекта нет или он не в архиве.
+    """
+    state = await project_repo.archive_state(project_id, lock=True)
+    if state is None or not state.is_archived:
+        await project_repo.session.rollback()
+        return False
+    try:
+        raw = await to_thread(storage.download_bytes, state.archive_key)
+        await project_repo.restore_archive(project_id, _from_parquet(raw))
+    except Exception:
+        await project_repo.session.rollback()
+        raise
+    # INFO: объект удаляется после фиксации — при сбое он просто останется лишним
+    await to_thread(storage.remove_file, state.archive_key)
+    log.info("Проект восстановлен из архива", project_id=str(project_id))
+    return True
+
+
+async def archive_projects(
+    project_repo: ProjectRepository,
+    storage: MinioHandler,
+    before_year: int,
+    limit: Optional[int] = None,
+) -> int:
+    """Архивирует завершённые проекты с `implementation_year < before_year`.
+
+    Кандидаты выбираются пачками по `ARCHIVE_BATCH_SIZE` по oid, каждый
+    проект — своя транзакция; ошибка на одном проекте не останавливает
+    остальные.
+
+    Returns:
+        Сколько проектов ушло в архив.
+    """
+    archived = 0
+    after = None
+    while limit is None or archived < limit:
+        oids = await project_repo.archive_candidates(
+            before_year, ARCHIVE_BATCH_SIZE, after
+        )
+        await project_repo.session.rollback()
+        if not oids:
+            break
+        for oid in oids:
+            if limit is not None and archived >= limit:
+                break
+            try:
+                archived += await archive_project(project_repo, storage, oid)
+            except Exception:
+                log.exception("Проект не заархивирован", project_id=str(oid))
+        after = oids[-1]
+    return archived
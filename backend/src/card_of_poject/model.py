@@ -1,23 +1,32 @@
 from datetime import datetime, timezone
 from decimal import Decimal
+from functools import cache
 from typing import TYPE_CHECKING, List
 from uuid import UUID as PyUUID
 
 
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
+    Computed,
     Date,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     TIMESTAMP,
     Numeric,
+    Sequence,
+    and_,
     func,
+    select,
+    text,
 )
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, aliased, mapped_column, relationship
 
 from src.core.models.common import BaseTimeMixin
 from src.core.models.id import BaseUUIDMixin
@@ -27,6 +36,18 @@ if TYPE_CHECKING:
     from src.core.auth.models import User
 
 
+# INFO: общий счётчик изменений для дельта-синхронизации (/projects/changes).
+# Значения ставят триггеры БД: при вставке и каждом UPDATE проекта или его
+# сводки, а также при удалении проекта (в project_tombstones).
+# Номер выдаётся при записи, а не при фиксации, поэтому рядом хранится
+# транзакция изменения (change_xid): лента упорядочена по паре
+# (change_xid, change_seq) и отдаёт только транзакции старше самой старой
+# незавершённой (см. ProjectRepository.changes).
+PROJECT_CHANGE_SEQ = Sequence("project_change_seq", metadata=Base.metadata)
+# pg_current_xact_id() — xid8; в bigint, чтобы сравнивать и хранить как число
+CURRENT_XID = text("(pg_current_xact_id()::text)::bigint")
+
+
 # === СПРАВОЧНИКИ ===
 class Service(Base, BaseUUIDMixin):
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
@@ -66,6 +87,7 @@ class EvaluationType(Base, BaseUUIDMixin):
 
 class CostType(Base, BaseUUIDMixin):
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
+    # INFO: дочерние строки удаляет БД (ON DELETE CASCADE), ORM их не грузит
     financial_periods: Mapped[List["FinancialPeriod"]] = relationship(
         "FinancialPeriod", back_populates="cost_type"
     )
@@ -106,6 +128,19 @@ class Project(Base, BaseUUIDMixin, BaseTimeMixin):
         ForeignKey("business_segments.oid"), nullable=True
     )
     implementation_year: Mapped[int] = mapped_column(Integer, nullable=True)
+    # INFO: копия Stage.probability (в процентах) на момент смены этапа
+    probability: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=True)
+
+    # INFO: счётчик версий для оптимистичной блокировки (If-Match)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="1")
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=text("nextval('project_change_seq')"),
+    )
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=CURRENT_XID
+    )
 
     # === Флаги ===
     is_industry_solution: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -130,6 +165,38 @@ class Project(Base, BaseUUIDMixin, BaseTimeMixin):
     completed_this_period: Mapped[str] = mapped_column(Text, nullable=True)
     plans_next_period: Mapped[str] = mapped_column(Text, nullable=True)
 
+    # === Архив ===
+    # INFO: архивный проект — заглушка: дочерние строки и длинные тексты
+    # лежат в Parquet-объекте `archive_key` приватного бакета (см. archive.py)
+    is_archived: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, server_default=text("false")
+    )
+    archive_key: Mapped[str] = mapped_column(String(255), nullable=True)
+
+    # === Поиск ===
+    # INFO: считается самой БД; deferred — в обычные SELECT не попадает
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(inn, '') || ' ' "
+            "|| coalesce(project_number, '')), 'A') "
+            "|| setweight(to_tsvector('russian', organization_name), 'A') "
+            "|| setweight(to_tsvector('russian', name), 'B') "
+            "|| setweight(to_tsvector('russian', coalesce(current_status, '') "
+            "|| ' ' || coalesce(plans_next_period, '')), 'C')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    # INFO: название без формы собственности, знаков и регистра — ключ
+    # поиска дублей (ProjectRepository.find_duplicates). Функцию
+    # normalize_organization_name создаёт миграция.
+    organization_key: Mapped[str] = mapped_column(
+        Text,
+        Computed("normalize_organization_name(organization_name)", persisted=True),
+        deferred=True,
+    )
+
     # === Связи ===
     service: Mapped["Service"] = relationship("Service", back_populates="projects")
     payment_type: Mapped["PaymentType"] = relationship(
@@ -149,22 +216,93 @@ class Project(Base, BaseUUIDMixin, BaseTimeMixin):
     )
 
     financial_periods: Mapped[List["FinancialPeriod"]] = relationship(
-        "FinancialPeriod", back_populates="project", cascade="all, delete-orphan"
+        "FinancialPeriod",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     history: Mapped[List["ProjectHistory"]] = relationship(
-        "ProjectHistory", back_populates="project", cascade="all, delete-orphan"
+        "ProjectHistory",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     comments: Mapped[List["Comment"]] = relationship(
-        "Comment", back_populates="project", cascade="all, delete-orphan"
+        "Comment",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     predictions: Mapped[List["ProjectPrediction"]] = relationship(
-        "ProjectPrediction", back_populates="project", cascade="all, delete-orphan"
+        "ProjectPrediction",
+        back_populates="project",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+    summary: Mapped["ProjectSummary"] = relationship(
+        "ProjectSummary", back_populates="project", uselist=False, viewonly=True
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
+    __table_args__ = (
+        # INFO: ключ keyset-пагинации списка проектов
+        Index("ix_projects_created_at_oid", "created_at", "oid"),
+        # INFO: список по умолчанию без архивных проектов
+        Index(
+            "ix_projects_active_created_at_oid",
+            "created_at",
+            "oid",
+            postgresql_where=text("NOT is_archived"),
+        ),
+        Index("ix_projects_change_xid_change_seq", "change_xid", "change_seq"),
+        # INFO: запросы менеджера (ProjectRepository.scope_to) идут с
+        # manager_id = :me — индексы под список, реестр и ленту изменений
+        Index("ix_projects_manager_id_created_at_oid", "manager_id", "created_at", "oid"),
+        Index(
+            "ix_projects_manager_id_organization_name_oid",
+            "manager_id",
+            "organization_name",
+            "oid",
+        ),
+        Index(
+            "ix_projects_manager_id_change_xid_change_seq",
+            "manager_id",
+            "change_xid",
+            "change_seq",
+        ),
+        Index("ix_projects_search_vector", "search_vector", postgresql_using="gin"),
+        # INFO: нечёткий поиск по организации (оператор %), нужен pg_trgm
+        Index(
+            "ix_projects_organization_name_trgm",
+            "organization_name",
+            postgresql_using="gin",
+            postgresql_ops={"organization_name": "gin_trgm_ops"},
+        ),
+        # INFO: кандидаты в дубли: похожий ключ организации (оператор %)
+        Index(
+            "ix_projects_organization_key_trgm",
+            "organization_key",
+            postgresql_using="gin",
+            postgresql_ops={"organization_key": "gin_trgm_ops"},
+        ),
+        # INFO: подсказки организаций по префиксу (LIKE 'abc%'). *_pattern_ops
+        # сравнивает побайтно, поэтому индекс подходит при любой локали БД.
+        Index(
+            "ix_projects_organization_name_prefix",
+            text("lower(organization_name) text_pattern_ops"),
+        ),
+        Index(
+            "ix_projects_inn_prefix",
+            "inn",
+            postgresql_ops={"inn": "varchar_pattern_ops"},
+        ),
     )
 
 
 class FinancialPeriod(Base, BaseUUIDMixin, BaseTimeMixin):
     project_id: Mapped[PyUUID] = mapped_column(
-        ForeignKey("projects.oid"), nullable=False, index=True
+        ForeignKey("projects.oid", ondelete="CASCADE"), nullable=False, index=True
     )
     year: Mapped[int] = mapped_column(Integer, nullable=False)
     month: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -194,10 +332,20 @@ class FinancialPeriod(Base, BaseUUIDMixin, BaseTimeMixin):
         "CostStatus", back_populates="financial_periods"
     )
 
+    __table_args__ = (
+        # INFO: окно периодов в реестре — index-only scan без обращения к таблице
+        Index(
+            "ix_financial_periods_year_month",
+            "year",
+            "month",
+            postgresql_include=["project_id", "revenue"],
+        ),
+    )
+
 
 class ProjectHistory(Base, BaseUUIDMixin):
     project_id: Mapped[PyUUID] = mapped_column(
-        ForeignKey("projects.oid"), nullable=False, index=True
+        ForeignKey("projects.oid", ondelete="CASCADE"), nullable=False, index=True
     )
     user_id: Mapped[PyUUID] = mapped_column(
         ForeignKey("users.oid"), nullable=False, index=True
@@ -214,10 +362,16 @@ class ProjectHistory(Base, BaseUUIDMixin):
     project: Mapped["Project"] = relationship("Project", back_populates="history")
     changed_by: Mapped["User"] = relationship("User", back_populates="history_entries")
 
+    __table_args__ = (
+        # INFO: последние N записей проекта и постраничная выдача истории
+        Index("ix_project_historys_project_id_changed_at", "project_id", "changed_at"),
+        Index("ix_project_historys_changed_at", "changed_at"),
+    )
+
 
 class Comment(Base, BaseUUIDMixin, BaseTimeMixin):
     project_id: Mapped[PyUUID] = mapped_column(
-        ForeignKey("projects.oid"), nullable=False, index=True
+        ForeignKey("projects.oid", ondelete="CASCADE"), nullable=False, index=True
     )
     user_id: Mapped[PyUUID] = mapped_column(
         ForeignKey("users.oid"), nullable=False, index=True
@@ -227,6 +381,10 @@ class Comment(Base, BaseUUIDMixin, BaseTimeMixin):
     project: Mapped["Project"] = relationship("Project", back_populates="comments")
     author: Mapped["User"] = relationship("User", back_populates="comments")
 
+    __table_args__ = (
+        Index("ix_comments_project_id_created_at", "project_id", "created_at"),
+    )
+
 
 class Report(Base, BaseUUIDMixin, BaseTimeMixin):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -250,7 +408,7 @@ class Dashboard(Base, BaseUUIDMixin, BaseTimeMixin):
 
 class ProjectPrediction(Base, BaseUUIDMixin, BaseTimeMixin):
     project_id: Mapped[PyUUID] = mapped_column(
-        ForeignKey("projects.oid"), nullable=False, index=True
+        ForeignKey("projects.oid", ondelete="CASCADE"), nullable=False, index=True
     )
     predicted_revenue: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=False)
     probability: Mapped[Decimal] = mapped_column(Numeric(5, 2), nullable=False)
@@ -262,3 +420,205 @@ class ProjectPrediction(Base, BaseUUIDMixin, BaseTimeMixin):
     )
 
     project: Mapped["Project"] = relationship("Project", back_populates="predictions")
+
+    __table_args__ = (
+        Index(
+            "ix_project_predictions_project_id_calculated_at",
+            "project_id",
+            "calculated_at",
+        ),
+    )
+
+
+class ProjectSummary(Base):
+    """Сводка по проекту для реестра, списка и аналитики.
+
+    Пишется только триггерами БД (функция `project_summary_refresh`, см.
+    миграцию) в той же транзакции, что и изменения проекта, периодов,
+    комментариев, истории и прогнозов (`refreshed_at` служит маркером
+    изменений для ETag). Из приложения — только чтение и полная
+    пересборка `summary_command.py`.
+    """
+
+    __tablename__ = "project_summaries"
+
+    project_id: Mapped[PyUUID] = mapped_column(
+        ForeignKey("projects.oid", ondelete="CASCADE"), primary_key=True
+    )
+    total_revenue: Mapped[Decimal] = mapped_column(
+        Numeric(15, 2), nullable=False, server_default="0"
+    )
+    total_costs: Mapped[Decimal] = mapped_column(
+        Numeric(15, 2), nullable=False, server_default="0"
+    )
+    # INFO: total_revenue * probability / 100 (вероятность в процентах)
+    weighted_revenue: Mapped[Decimal] = mapped_column(
+        Numeric(15, 2), nullable=False, server_default="0"
+    )
+    # INFO: coalesce(projects.probability, 0) — NOT NULL копия для сортировки,
+    # чтобы все ключи сортировки списка лежали в одной таблице
+    probability: Mapped[Decimal] = mapped_column(
+        Numeric(5, 2), nullable=False, server_default="0"
+    )
+    last_stage_change_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=True
+    )
+    # последняя правка проекта или его периодов, истории, комментариев, прогнозов
+    last_activity_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+    comments_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    history_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    refreshed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=text("nextval('project_change_seq')"),
+    )
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=CURRENT_XID
+    )
+
+    project: Mapped["Project"] = relationship(
+        "Project", back_populates="summary", viewonly=True
+    )
+
+    __table_args__ = (
+        # INFO: сортировки списка (sort=...), keyset по (значение, project_id)
+        Index("ix_project_summaries_weighted_revenue", "weighted_revenue", "project_id"),
+        Index("ix_project_summaries_total_revenue", "total_revenue", "project_id"),
+        Index("ix_project_summaries_probability", "probability", "project_id"),
+        Index("ix_project_summaries_last_activity_at", "last_activity_at", "project_id"),
+        Index("ix_project_summaries_change_xid_change_seq", "change_xid", "change_seq"),
+    )
+
+
+class ProjectArchivePeriod(Base):
+    """Выручка и затраты архивного проекта по месяцам.
+
+    Свёртка финансовых периодов, которая остаётся в БД после архивации:
+    по ней реестр считает выручку в окне дат. Итоги проекта остаются в
+    `project_summaries` — для архивных проектов сводка не пересчитывается.
+    """
+
+    __tablename__ = "project_archive_periods"
+
+    project_id: Mapped[PyUUID] = mapped_column(
+        ForeignKey("projects.oid", ondelete="CASCADE"), primary_key=True
+    )
+    year: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=True)
+    costs: Mapped[Decimal] = mapped_column(Numeric(15, 2), nullable=True)
+
+
+class ProjectTombstone(Base):
+    """Метка удалённого проекта для дельта-синхронизации.
+
+    Пишется триггером при DELETE проекта и убирается, если проект с тем же
+    oid снова появляется. `manager_id` — менеджер проекта на момент
+    удаления: менеджеру лента отдаёт только его удаления.
+    """
+
+    __tablename__ = "project_tombstones"
+
+    project_id: Mapped[PyUUID] = mapped_column(primary_key=True)
+    # NULL у меток, записанных до появления колонки, — их видит только ADMIN
+    manager_id: Mapped[PyUUID] = mapped_column(nullable=True)
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=text("nextval('project_change_seq')"),
+    )
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=CURRENT_XID
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_project_tombstones_change_xid_change_seq", "change_xid", "change_seq"),
+        Index(
+            "ix_project_tombstones_manager_id_change_xid_change_seq",
+            "manager_id",
+            "change_xid",
+            "change_seq",
+        ),
+    )
+
+
+class ProjectScopeExit(Base):
+    """Уход проекта из области менеджера для дельта-синхронизации.
+
+    Пишется триггером, когда у проекта меняется `manager_id`: прежний
+    менеджер получает в ленте событие, что проект у него больше не виден.
+    Убирается, если проект возвращается к тому же менеджеру.
+    """
+
+    __tablename__ = "project_scope_exits"
+
+    project_id: Mapped[PyUUID] = mapped_column(primary_key=True)
+    manager_id: Mapped[PyUUID] = mapped_column(primary_key=True)
+    change_seq: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default=text("nextval('project_change_seq')"),
+    )
+    change_xid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=CURRENT_XID
+    )
+    left_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=func.now()
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_project_scope_exits_manager_id_change_xid_change_seq",
+            "manager_id",
+            "change_xid",
+            "change_seq",
+        ),
+    )
+
+
+# === Последние N записей дочерних коллекций (для карточки проекта) ===
+LATEST_CHILDREN_LIMIT = 20
+
+
+def _latest_children(child, order_by: str):
+    """viewonly-связь Project → последние `LATEST_CHILDREN_LIMIT` строк `child`.
+
+    Top-N-per-parent через row_number() по project_id: selectinload по такой
+    связи даёт один запрос на всю коллекцию, ограниченный на стороне БД.
+    """
+    table = child.__table__
+    ranked = select(
+        table,
+        func.row_number()
+        .over(partition_by=table.c.project_id, order_by=table.c[order_by].desc())
+        .label("row_number"),
+    ).subquery()
+    # INFO: алиас создаётся лениво — aliased() конфигурирует мапперы,
+    # а User объявлен в другом модуле и на момент импорта ещё не известен.
+    latest = cache(lambda: aliased(child, ranked))
+    return relationship(
+        latest,
+        primaryjoin=lambda: and_(
+            latest().project_id == Project.oid,
+            ranked.c.row_number <= LATEST_CHILDREN_LIMIT,
+        ),
+        order_by=ranked.c.row_number,
+        viewonly=True,
+    )
+
+
+Project.latest_history = _latest_children(ProjectHistory, "changed_at")
+Project.latest_comments = _latest_children(Comment, "created_at")
+Project.latest_predictions = _latest_children(ProjectPrediction, "calculated_at")
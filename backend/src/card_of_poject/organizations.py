@@ -0,0 +1,85 @@
+__all__ = [
+    "ORGANIZATION_SUGGEST_LIMIT",
+    "invalidate_organizations",
+    "suggest_organizations",
+]
+from asyncio import Lock
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import Row
+
+from src.card_of_poject.repository.project import ProjectRepository
+
+# INFO: подсказки организаций для формы проекта. Самые частые организации
+# держатся в памяти процесса, и запрос на каждое нажатие клавиши в БД не
+# ходит. Запись проектов сбрасывает кэш своего воркера, остальные
+# перечитают его по ORGANIZATION_CACHE_TTL.
+ORGANIZATION_SUGGEST_LIMIT = 10
+ORGANIZATION_CACHE_SIZE = 5000
+ORGANIZATION_CACHE_TTL = timedelta(minutes=5)
+
+
+@dataclass
+class _OrganizationCache:
+    # (название в нижнем регистре, ИНН, строка) — от частых к редким
+    rows: List[Tuple[str, str, Row]] = field(default_factory=list)
+    # в кэше все организации, а не только первые ORGANIZATION_CACHE_SIZE
+    complete: bool = False
+    loaded_at: Optional[datetime] = None
+    lock: Lock = field(default_factory=Lock)
+
+
+_CACHE = _OrganizationCache()
+
+
+def invalidate_organizations() -> None:
+    """Сбрасывает кэш после записи проектов."""
+    _CACHE.loaded_at = None
+
+
+def _is_fresh() -> bool:
+    return (
+        _CACHE.loaded_at is not None
+        and datetime.now(timezone.utc) - _CACHE.loaded_at < ORGANIZATION_CACHE_TTL
+    )
+
+
+async def _load(project_repo: ProjectRepository) -> None:
+    async with _CACHE.lock:
+        # пока ждали блокировку, кэш мог загрузить другой запрос
+        if _is_fresh():
+            return
+        loaded_at = datetime.now(timezone.utc)
+        rows = await project_repo.top_organizations(ORGANIZATION_CACHE_SIZE)
+        _CACHE.rows = [(row.organization_name.lower(), row.inn or "", row) for row in rows]
+        _CACHE.complete = len(rows) < ORGANIZATION_CACHE_SIZE
+        _CACHE.loaded_at = loaded_at
+
+
+async def suggest_organizations(
+    project_repo: ProjectRepository,
+    prefix: str,
+    limit: int = ORGANIZATION_SUGGEST_LIMIT,
+) -> Sequence[Row]:
+    """Организации, название или ИНН которых начинается с `prefix`.
+
+    Сначала ищет в кэше. Организации вне кэша встречаются не чаще
+    последней в нём, поэтому `limit` совпадений из кэша — уже ответ.
+    Если совпадений меньше, а кэш неполный, запрос идёт в БД по
+    префиксным индексам.
+    """
+    if not _is_fresh():
+        await _load(project_repo)
+    prefix = prefix.strip().lower()
+    matches = (
+        row
+        for name, inn, row in _CACHE.rows
+        if name.startswith(prefix) or inn.startswith(prefix)
+    )
+    found = list(islice(matches, limit))
+    if len(found) == limit or _CACHE.complete:
+        return found
+    return await project_repo.suggest_organizations(prefix, limit)
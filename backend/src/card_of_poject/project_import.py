@@ -0,0 +1,219 @@
+__all__ = ["IMPORT_BATCH_SIZE", "read_rows", "import_projects"]
+import csv
+import io
+import itertools
+from asyncio import to_thread
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple, Union
+from uuid import UUID as PyUUID
+
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from structlog import get_logger
+
+from src.card_of_poject.repository.project import ProjectRepository
+from src.card_of_poject.schemas.project import ProjectCreate
+from src.core.exceptions import InvalidInputError
+
+log = get_logger(__name__)
+
+IMPORT_BATCH_SIZE = 1000
+# INFO: ошибок (и строк с дублями) в ответе не больше этого, остальные
+# ошибки только считаются
+IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# колонка файла с названием из справочника → поле проекта с его id
+REFERENCE_COLUMNS = {
+    "stage": "stage_id",
+    "service": "service_id",
+    "business_segment": "business_segment_id",
+    "payment_type": "payment_type_id",
+    "accepted_for_evaluation": "accepted_for_evaluation_id",
+    "manager": "manager_id",  # email
+}
+
+# INFO: ИНН — 10 или 12 цифр, и у регионов 01–09 он начинается с нуля.
+# Excel хранит такой ИНН числом и теряет ровно этот ноль.
+ZERO_PADDED_COLUMNS = {"inn": (10, 12)}
+
+
+def _read_csv(file: BinaryIO) -> Iterator[dict]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    # Excel с русской локалью сохраняет CSV через `;`
+    try:
+        dialect = csv.Sniffer().sniff(text.readline(), delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    text.seek(0)
+    yield from csv.DictReader(text, dialect=dialect)
+
+
+def _cell_text(cell) -> Any:
+    """Значение ячейки XLSX строкой, как в CSV.
+
+    Целое число, сохранённое как float, пишется без `.0`; у формата из
+    одних нулей (`0000000000`) восстанавливаются ведущие нули, которые
+    Excel показывает, но не хранит.
+    """
+    value = cell.value
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value)
+    number_format = getattr(cell, "number_format", None) or ""
+    if isinstance(value, int) and number_format and set(number_format) == {"0"}:
+        text = text.zfill(len(number_format))
+    return text
+
+
+def _read_xlsx(file: BinaryIO) -> Iterator[dict]:
+    # INFO: openpyxl нужен только импорту, поэтому импортируется здесь.
+    # read_only читает лист потоково, не собирая его в памяти.
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows()
+        header = [(_cell_text(cell) or "").strip() for cell in next(rows, ())]
+        for cells in rows:
+            yield dict(zip(header, map(_cell_text, cells)))
+    finally:
+        workbook.close()
+
+
+def read_rows(file: BinaryIO, filename: str) -> Iterator[dict]:
+    """Строки CSV/XLSX как словари `заголовок → значение`, по одной.
+
+    Raises:
+        InvalidInputError: неподдерживаемое расширение файла.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        return _read_csv(file)
+    if name.endswith(".xlsx"):
+        return _read_xlsx(file)
+    raise InvalidInputError()
+
+
+def _to_project(raw: dict, names: Dict[str, Dict[str, PyUUID]]) -> dict:
+    """Строка файла → данные `ProjectCreate`. Ошибки — ValueError со списком."""
+    data = {}
+    for key, value in raw.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if key and value not in (None, ""):
+            data[key.strip()] = value
+    for column, widths in ZERO_PADDED_COLUMNS.items():
+        value = data.get(column)
+        if isinstance(value, str) and value.isdigit():
+            width = next((width for width in widths if len(value) == width - 1), None)
+            if width is not None:
+                data[column] = value.zfill(width)
+
+    errors = []
+    unresolved = set()
+    for column, field in REFERENCE_COLUMNS.items():
+        # INFO: id справочника в файле не принимается: он бы миновал
+        # сопоставление по названию и проверку существования
+        if data.pop(field, None) is not None:
+            errors.append(f"{field}: укажите колонку «{column}» с названием")
+            unresolved.add(field)
+        name = data.pop(column, None)
+        if name is None:
+            continue
+        oid = names[field].get(str(name).strip().lower())
+        if oid is None:
+            errors.append(f"{column}: «{name}» не найден")
+            unresolved.add(field)
+        else:
+            data[field] = oid
+    try:
+        project = ProjectCreate.model_validate(data)
+    except ValidationError as e:
+        errors += [
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            for error in e.errors()
+            if error["loc"][0] not in unresolved
+        ]
+    if errors:
+        raise ValueError(errors)
+    return project.model_dump()
+
+
+def _parse_rows(
+    rows: Iterator[Tuple[int, dict]], names: Dict[str, Dict[str, PyUUID]], size: int
+) -> Tuple[List[Tuple[int, Union[dict, List[str]]]], int]:
+    """Следующие `size` строк файла → (номер строки, данные или ошибки).
+
+    Returns:
+        разобранные непустые строки и сколько строк файла прочитано.
+    """
+    parsed, read = [], 0
+    for row, raw in itertools.islice(rows, size):
+        read += 1
+        if not any(value not in (None, "") for value in raw.values()):
+            continue
+        try:
+            parsed.append((row, _to_project(raw, names)))
+        except ValueError as e:
+            parsed.append((row, e.args[0]))
+    return parsed, read
+
+
+async def import_projects(rows: Iterable[dict], project_repo: ProjectRepository) -> dict:
+    """Импортирует проекты из строк файла пачками по `IMPORT_BATCH_SIZE`.
+
+    Справочники загружаются один раз в словари имя → id. Каждая пачка —
+    один INSERT и своя транзакция: ошибка в пачке не откатывает уже
+    записанные. Строки с ошибками пропускаются и попадают в отчёт.
+    Созданные строки, похожие на существующие проекты (в том числе из
+    прошлых пачек), тоже попадают в отчёт.
+
+    INFO: чтение файла (openpyxl, csv) и проверка строк синхронные, поэтому
+    идут в отдельном потоке порциями, не останавливая цикл событий.
+    """
+    names, probabilities = await project_repo.reference_names()
+    report = {"total": 0, "created": 0, "failed": 0, "errors": [], "duplicates": []}
+
+    def fail(row: int, errors: List[str]) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < IMPORT_MAX_REPORTED_ERRORS:
+            report["errors"].append({"row": row, "errors": errors})
+
+    async def flush(batch: List[Tuple[int, dict]]) -> None:
+        items = [item for _, item in batch]
+        try:
+            # дубли ищутся до вставки, иначе строка пачки нашлась бы сама
+            duplicates = await project_repo.find_duplicates(items)
+            await project_repo.insert_many(items, probabilities)
+        except SQLAlchemyError as e:
+            await project_repo.session.rollback()
+            reason = str(getattr(e, "orig", None) or e)
+            log.warning("Пачка импорта не записана", error=reason)
+            for row, _ in batch:
+                fail(row, [f"запись в БД: {reason}"])
+        else:
+            report["created"] += len(batch)
+            for index, found in duplicates.items():
+                if len(report["duplicates"]) < IMPORT_MAX_REPORTED_ERRORS:
+                    report["duplicates"].append({"row": batch[index][0], "duplicates": found})
+
+    batch = []
+    # строка 1 — заголовок
+    numbered = enumerate(rows, start=2)
+    while True:
+        parsed, read = await to_thread(_parse_rows, numbered, names, IMPORT_BATCH_SIZE)
+        for row, result in parsed:
+            report["total"] += 1
+            if isinstance(result, list):
+                fail(row, result)
+                continue
+            batch.append((row, result))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if read < IMPORT_BATCH_SIZE:
+            break
+    if batch:
+        await flush(batch)
+    return report
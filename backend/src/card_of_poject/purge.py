@@ -0,0 +1,104 @@
+__all__ = [
+    "PURGE_BATCH_SIZE",
+    "PURGE_THRESHOLD",
+    "PurgeJob",
+    "get_purge_job",
+    "start_purge",
+    "run_purge",
+]
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from uuid import UUID as PyUUID, uuid4
+
+from structlog import get_logger
+
+from src.card_of_poject.model import (
+    Comment,
+    FinancialPeriod,
+    Project,
+    ProjectHistory,
+    ProjectPrediction,
+)
+from src.card_of_poject.organizations import invalidate_organizations
+from src.card_of_poject.repository.project import ProjectRepository
+from src.database import session_maker
+
+log = get_logger(__name__)
+
+# INFO: проекты, у которых дочерних строк больше порога, удаляются фоновой
+# задачей пачками: один каскадный DELETE держал бы блокировки и транзакцию
+# всё время удаления.
+PURGE_THRESHOLD = 20_000
+PURGE_BATCH_SIZE = 5_000
+# сколько держать в реестре завершённые задачи
+PURGE_JOB_TTL = timedelta(hours=1)
+
+_CHILD_MODELS = (FinancialPeriod, ProjectHistory, Comment, ProjectPrediction)
+
+
+@dataclass
+class PurgeJob:
+    """Состояние фоновой очистки проекта (для GET /projects/purge-jobs/{oid})."""
+
+    project_id: PyUUID
+    total: int
+    oid: PyUUID = field(default_factory=uuid4)
+    deleted: int = 0
+    status: str = "pending"  # pending → running → done | failed
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+
+
+# INFO: реестр живёт в памяти процесса: при нескольких воркерах статус
+# задачи виден только в том, который её запустил.
+_JOBS: Dict[PyUUID, PurgeJob] = {}
+
+
+def get_purge_job(oid: PyUUID) -> Optional[PurgeJob]:
+    return _JOBS.get(oid)
+
+
+def start_purge(project_id: PyUUID, total: int) -> Tuple[PurgeJob, bool]:
+    """Регистрирует задачу; для уже очищаемого проекта возвращает текущую.
+
+    Returns:
+        (задача, создана ли она сейчас — тогда её нужно запустить)
+    """
+    now = datetime.now(timezone.utc)
+    for oid, job in list(_JOBS.items()):
+        if job.finished_at and now - job.finished_at > PURGE_JOB_TTL:
+            del _JOBS[oid]
+        elif job.project_id == project_id and not job.finished_at:
+            return job, False
+    job = PurgeJob(project_id=project_id, total=total)
+    _JOBS[job.oid] = job
+    return job, True
+
+
+async def run_purge(job: PurgeJob) -> None:
+    """Удаляет дочерние строки пачками по `PURGE_BATCH_SIZE`, затем сам проект.
+
+    Каждая пачка — своя транзакция, прогресс виден в `job.deleted`.
+    Запускается после ответа, поэтому работает в собственной сессии.
+    """
+    job.status = "running"
+    try:
+        async with session_maker() as session:
+            project_repo = ProjectRepository(session, model=Project)
+            for model in _CHILD_MODELS:
+                while deleted := await project_repo.delete_children_batch(
+                    model, job.project_id, PURGE_BATCH_SIZE
+                ):
+                    job.deleted += deleted
+            await project_repo.delete(job.project_id)
+        invalidate_organizations()
+        job.status = "done"
+        log.info("Проект удалён", project_id=str(job.project_id), rows=job.deleted)
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+        log.exception("Очистка проекта прервана", project_id=str(job.project_id))
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict, TypeVar, Generic, Union, Type, List, Optional
+from typing import Dict, Sequence, Tuple, TypeVar, Generic, Union, Type, List, Optional
 from uuid import UUID as PyUUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, select, delete, update
@@ -12,6 +12,7 @@ from src.card_of_poject.model import (
     Report,
 )
 from src.core.exceptions import ResourceAlreadyExistsError, ResourceNotFoundError
+from src.core.pagination import next_cursor, paginate
 from src.models import Base
 
 Entity = TypeVar("Entity", bound=Base)
@@ -120,3 +121,18 @@ class ProjectPredictionRepository(BaseRepository[ProjectPrediction]):
         )
         result = await self.session.execute(query)
         return result.scalars().first()
+
+    async def list_page(
+        self, project_id: IDType, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[Sequence[ProjectPrediction], Optional[str]]:
+        query = select(ProjectPrediction).where(
+            ProjectPrediction.project_id == project_id
+        )
+        query = paginate(
+            query,
+            [ProjectPrediction.calculated_at, ProjectPrediction.oid],
+            limit,
+            cursor,
+        )
+        result = await self.session.execute(query)
+        return next_cursor(result.scalars().all(), limit, ["calculated_at", "oid"])
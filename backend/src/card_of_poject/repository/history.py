@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import List,  Dict
+from typing import List,  Dict, Optional, Sequence, Tuple
 from uuid import UUID as PyUUID
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy import select
 from src.card_of_poject.model import ProjectHistory, Stage
 from src.card_of_poject.repository.base_repository import BaseRepository
+from src.core.pagination import next_cursor, paginate
 
 
 class ProjectHistoryRepository(BaseRepository[ProjectHistory]):
@@ -21,6 +22,20 @@ class ProjectHistoryRepository(BaseRepository[ProjectHistory]):
         result = await self.session.execute(query)
         return result.scalars().all()
 
+    async def list_page(
+        self, project_id: PyUUID, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[Sequence[ProjectHistory], Optional[str]]:
+        query = (
+            select(ProjectHistory)
+            .where(ProjectHistory.project_id == project_id)
+            .options(joinedload(ProjectHistory.changed_by))
+        )
+        query = paginate(
+            query, [ProjectHistory.changed_at, ProjectHistory.oid], limit, cursor
+        )
+        result = await self.session.execute(query)
+        return next_cursor(result.scalars().all(), limit, ["changed_at", "oid"])
+
     async def list_for_period(
         self, start_date: datetime, end_date: datetime
     ) -> List[ProjectHistory]:
@@ -1,83 +1,1406 @@
-from datetime import datetime
-from typing import Dict, List, Optional
-from sqlalchemy.orm import selectinload
+import asyncio
+import heapq
+import itertools
+from collections import deque
+from datetime import datetime, timezone
+from uuid import UUID as PyUUID
+from decimal import Decimal
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import aliased, joinedload, noload, selectinload
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    ARRAY,
+    BigInteger,
+    Boolean,
+    Row,
+    Select,
+    Text,
+    Date,
+    Uuid,
+    and_,
+    case,
+    cast,
+    column,
+    delete,
+    exists,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    true,
+    tuple_,
+    union,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array
+from sqlalchemy.ext.asyncio import AsyncConnection
 from src.card_of_poject.model import (
     BusinessSegment,
+    Comment,
+    EvaluationType,
     FinancialPeriod,
+    PaymentType,
     Project,
     ProjectHistory,
+    ProjectArchivePeriod,
+    ProjectPrediction,
+    ProjectScopeExit,
+    ProjectSummary,
+    ProjectTombstone,
     Service,
     Stage,
 )
 from src.card_of_poject.repository.base_repository import BaseRepository, IDType
 from src.core.auth.models import User
+from src.core.exceptions import InvalidInputError, ResourceConflictError
+from src.core.models.id import uuid7
+from src.core.models.role import Role
+from src.core.pagination import next_cursor, paginate
+
+
+# Справочники карточки (many-to-one) — грузятся одним JOIN.
+PROJECT_REFERENCES = ("service", "manager", "stage", "business_segment")
+# Дочерние коллекции — грузятся только по запросу через `expand`.
+PROJECT_EXPANDABLE = ("financial_periods", "history", "comments", "predictions")
+
+# Фильтры списка проектов (ключи словаря `filters`).
+PROJECT_FILTERS = ("stage_id", "manager_id", "business_segment_id", "service_id")
+PROJECT_RANGES = ("implementation_year", "probability")
+PROJECT_FLAGS = (
+    "is_industry_solution",
+    "is_forecast_accepted",
+    "is_dzo_implementation",
+    "requires_management_control",
+    "is_archived",
+)
+
+# Внешние ключи проекта → справочник, в котором их надо проверить.
+PROJECT_REFERENCE_MODELS = {
+    "service_id": Service,
+    "manager_id": User,
+    "stage_id": Stage,
+    "payment_type_id": PaymentType,
+    "business_segment_id": BusinessSegment,
+    "accepted_for_evaluation_id": EvaluationType,
+}
+
+# Сортировки списка: имя в `sort` → (колонка, уникальная колонка keyset).
+# Метрики лежат в project_summaries (NOT NULL, с индексами по паре колонок).
+PROJECT_SORTS = {
+    "created_at": (Project.created_at, Project.oid),
+    "weighted_revenue": (ProjectSummary.weighted_revenue, ProjectSummary.project_id),
+    "total_revenue": (ProjectSummary.total_revenue, ProjectSummary.project_id),
+    "probability": (ProjectSummary.probability, ProjectSummary.project_id),
+    "last_activity": (ProjectSummary.last_activity_at, ProjectSummary.project_id),
+}
+
+# Завершённый проект — на этапе с такой вероятностью (проигран / реализован):
+# отдельного признака закрытия у этапа нет.
+PROJECT_CLOSED_PROBABILITIES = (0, 100)
+# Длинные тексты, которые в заглушке архивного проекта очищаются.
+PROJECT_ARCHIVED_TEXTS = ("current_status", "completed_this_period", "plans_next_period")
+# Дочерние таблицы, которые уходят в архив (ключи — как в expand).
+_ARCHIVE_TABLES = {
+    "financial_periods": FinancialPeriod,
+    "history": ProjectHistory,
+    "comments": Comment,
+    "predictions": ProjectPrediction,
+}
+
+# INFO: дубль — проект с похожим ключом организации (similarity) или тем
+# же ИНН (оценка 1). Ниже порога совпадение не показывается.
+DUPLICATE_MIN_SCORE = 0.5
+DUPLICATE_LIMIT = 5
+
+# INFO: у PostgreSQL (и asyncpg) не больше 32767 параметров на запрос —
+# пачки из PROJECT_BULK_LIMIT элементов режутся на части под эту границу
+MAX_BIND_PARAMS = 32767
+
+
+def _chunked(rows: Sequence, params_per_row: int, reserved: int = 0) -> Iterable[Sequence]:
+    """`rows` частями, в каждой не больше `MAX_BIND_PARAMS - reserved` параметров."""
+    size = max(1, (MAX_BIND_PARAMS - reserved) // params_per_row)
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+# Соединений пула на один запрос аналитики (плюс одно — держит снимок).
+ANALYTICS_CONCURRENCY = 4
+# Сколько запросов аналитики на процесс выполняются параллельно. Вместе они
+# берут до (1 + ANALYTICS_CONCURRENCY) * 2 = 10 соединений из 15 пула по
+# умолчанию (5 + 10 overflow); остальные запросы аналитики в это время идут
+# по очереди в своей сессии и лишних соединений не берут.
+ANALYTICS_PARALLEL_RUNS = 2
+_analytics_runs = asyncio.Semaphore(ANALYTICS_PARALLEL_RUNS)
+
+# Дочерние коллекции, которые можно скопировать при клонировании проекта.
+PROJECT_CLONE_CHILDREN = ("financial_periods", "predictions")
+# Колонки, которые при копировании не переносятся: их ставит БД.
+_CLONE_SKIP = {
+    "update_at",
+    "version",
+    "change_seq",
+    "change_xid",
+    "search_vector",
+    "organization_key",
+    "is_archived",
+    "archive_key",
+    # номер присваивается новому проекту заново, копия его не наследует
+    "project_number",
+}
+
+# имя в expand → (связь, вложенные связи для сериализации элементов)
+_COLLECTIONS = {
+    "financial_periods": (
+        Project.financial_periods,
+        ("revenue_status", "cost_type", "cost_status"),
+    ),
+    "history": (Project.history, ("changed_by",)),
+    "comments": (Project.comments, ("author",)),
+    "predictions": (Project.predictions, ()),
+}
+# В карточке растущие коллекции ограничены последними N записями.
+_CARD_COLLECTIONS = {
+    **_COLLECTIONS,
+    "history": (Project.latest_history, ("changed_by",)),
+    "comments": (Project.latest_comments, ("author",)),
+    "predictions": (Project.latest_predictions, ()),
+}
 
 
 class ProjectRepository(BaseRepository[Project]):
-    async def get(self, id: IDType) -> Optional[Project]:
+    # INFO: менеджер, которым ограничены списки, реестр и аналитика
+    # (см. `scope_to`); None — видны все проекты.
+    manager_scope: Optional[PyUUID] = None
+
+    def scope_to(self, user_oid: PyUUID, role: int) -> "ProjectRepository":
+        """Ограничивает запросы репозитория проектами менеджера.
+
+        Для `Role.MANAGER` в списки, поиск, фасеты, ленту изменений, реестр
+        и аналитику добавляется `WHERE manager_id = :me` — условие
+        закрывают индексы, начинающиеся с manager_id. Остальные роли видят всё.
+        """
+        self.manager_scope = user_oid if role == Role.MANAGER else None
+        return self
+
+    def _scoped(self, query: Select) -> Select:
+        """Условие области видимости для запроса по projects."""
+        if self.manager_scope is None:
+            return query
+        return query.where(Project.manager_id == self.manager_scope)
+
+    def _scoped_children(self, query: Select, project_id) -> Select:
+        """То же для подзапроса по дочерней таблице (`project_id` — её колонка)."""
+        if self.manager_scope is None:
+            return query
+        return query.where(
+            project_id.in_(
+                select(Project.oid).where(Project.manager_id == self.manager_scope)
+            )
+        )
+
+    async def can_access(self, id: IDType) -> Optional[bool]:
+        """Виден ли проект в текущей области: одна проверка в БД вместо
+        загрузки проекта.
+
+        Returns:
+            None, если проекта нет.
+        """
+        visible = (
+            Project.manager_id == self.manager_scope
+            if self.manager_scope is not None
+            else true()
+        )
+        result = await self.session.execute(
+            select(visible).where(Project.oid == id)
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    def _load_options(expand: Iterable[str], collections: dict = _COLLECTIONS) -> List:
+        """Строит loader options по списку связей.
+
+        Raises:
+            InvalidInputError: неизвестное имя связи.
+        """
+        options = []
+        for name in expand:
+            if name in PROJECT_REFERENCES:
+                options.append(joinedload(getattr(Project, name)))
+            elif name in collections:
+                relation, nested = collections[name]
+                loader = selectinload(relation)
+                # класс или алиас (для latest_*) на другой стороне связи
+                target = relation.property.entity.entity
+                options.extend(loader.joinedload(getattr(target, n)) for n in nested)
+                if not nested:
+                    options.append(loader)
+            else:
+                raise InvalidInputError()
+        return options
+
+    async def get(self, id: IDType, expand: Iterable[str] = ()) -> Optional[Project]:
+        """Проект по id. Без `expand` — голая строка без связей (для проверок)."""
         query = (
             select(Project)
             .where(Project.oid == id)
-            .options(
-                selectinload(Project.service),
-                selectinload(Project.manager),
-                selectinload(Project.stage),
-                selectinload(Project.financialperiods),
-                selectinload(Project.comments),
-                selectinload(Project.history),
-                selectinload(Project.predictions),
-            )
+            .options(*self._load_options(expand))
         )
         result = await self.session.execute(query)
         return result.scalars().first()
 
-    async def list(self, filters: Optional[dict] = None) -> List[Project]:
-        query = select(Project).options(
-            selectinload(Project.service),
-            selectinload(Project.manager),
-            selectinload(Project.stage),
-            selectinload(Project.financialperiods),
-        )
-        if filters:
-            if "stage_id" in filters:
-                query = query.where(Project.stage_id == filters["stage_id"])
-            if "manager_id" in filters:
-                query = query.where(Project.manager_id == filters["manager_id"])
-            if "business_segment_id" in filters:
-                query = query.where(
-                    Project.business_segment_id == filters["business_segment_id"]
-                )
-            if "service_id" in filters:
-                query = query.where(Project.service_id == filters["service_id"])
+    async def get_card(
+        self, id: IDType, expand: Iterable[str] = ()
+    ) -> Optional[Project]:
+        """Проект для карточки: справочники + только запрошенные коллекции.
+
+        history/comments/predictions ограничены последними
+        `LATEST_CHILDREN_LIMIT` записями (связи `latest_*`). Коллекции вне
+        `expand` не загружаются (`noload`) и отдаются пустыми, чтобы
+        сериализация не делала ленивых запросов.
+        """
+        expand = set(expand)
+        options = self._load_options((*PROJECT_REFERENCES, *expand), _CARD_COLLECTIONS)
+        options.extend(
+            noload(relation)
+            for name, (relation, _) in _CARD_COLLECTIONS.items()
+            if name not in expand
+        )
+        query = select(Project).where(Project.oid == id).options(*options)
+        result = await self.session.execute(query)
+        return result.unique().scalars().first()
+
+    async def card_version(self, id: IDType) -> Optional[Row]:
+        """Маркеры изменений карточки для ETag: один lookup по первичному ключу.
+
+        `update_at` меняется при правке проекта, `refreshed_at` сводки —
+        при любом изменении периодов, истории, комментариев и прогнозов.
+        `version` — версия проекта для If-Match.
+        """
+        query = (
+            select(
+                Project.version,
+                Project.created_at,
+                Project.update_at,
+                ProjectSummary.refreshed_at,
+            )
+            .outerjoin(ProjectSummary, ProjectSummary.project_id == Project.oid)
+            .where(Project.oid == id)
+        )
+        result = await self.session.execute(query)
+        return result.first()
+
+    async def count_children(self, id: IDType) -> Row:
+        """Размеры дочерних коллекций проекта одним запросом."""
+
+        def count(model):
+            return (
+                select(func.count())
+                .select_from(model)
+                .where(model.project_id == id)
+                .scalar_subquery()
+            )
+
+        query = select(
+            count(FinancialPeriod).label("financial_periods"),
+            count(ProjectHistory).label("history"),
+            count(Comment).label("comments"),
+            count(ProjectPrediction).label("predictions"),
+        )
+        result = await self.session.execute(query)
+        return result.one()
+
+    @staticmethod
+    def _apply_filters(query: Select, filters: Optional[dict]) -> Select:
+        """Фильтры списка: см. `PROJECT_FILTERS`, `PROJECT_RANGES`, `PROJECT_FLAGS`.
+
+        Значение фильтра по справочнику — один id или список id (IN);
+        диапазоны задаются ключами `<поле>_from` / `<поле>_to` включительно.
+        """
+        if not filters:
+            return query
+        for name in PROJECT_FILTERS:
+            value = filters.get(name)
+            if value is None or value == []:
+                continue
+            column = getattr(Project, name)
+            if isinstance(value, (list, tuple, set)):
+                query = query.where(column.in_(value))
+            else:
+                query = query.where(column == value)
+        for name in PROJECT_RANGES:
+            column = getattr(Project, name)
+            if filters.get(f"{name}_from") is not None:
+                query = query.where(column >= filters[f"{name}_from"])
+            if filters.get(f"{name}_to") is not None:
+                query = query.where(column <= filters[f"{name}_to"])
+        for name in PROJECT_FLAGS:
+            if filters.get(name) is not None:
+                query = query.where(getattr(Project, name) == filters[name])
+        return query
+
+    async def delete(self, id: IDType) -> bool:
+        """Удаляет проект одним DELETE; дочерние строки удаляет БД (ON DELETE CASCADE).
+
+        Returns:
+            False, если проекта не было.
+        """
+        result = await self.session.execute(
+            delete(Project).where(Project.oid == id).returning(Project.oid)
+        )
+        deleted = result.scalar_one_or_none() is not None
+        await self.session.commit()
+        return deleted
+
+    async def delete_children_batch(
+        self, model: type, project_id: IDType, batch_size: int
+    ) -> int:
+        """Удаляет до `batch_size` строк дочерней таблицы проекта в своей транзакции.
+
+        Сводка проекта при этом не пересчитывается (`project_summary.skip`):
+        пакетами чистятся только проекты, которые затем удаляются целиком.
+
+        Returns:
+            Сколько строк удалено; 0 — таблица для проекта пуста.
+        """
+        await self.session.execute(text("SET LOCAL project_summary.skip = 'on'"))
+        batch = (
+            select(model.oid)
+            .where(model.project_id == project_id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            delete(model)
+            .where(model.oid.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    async def archive_candidates(
+        self, before_year: int, limit: int, after: Optional[PyUUID] = None
+    ) -> List[PyUUID]:
+        """Завершённые проекты с `implementation_year` раньше `before_year`,
+        ещё не ушедшие в архив; по oid после `after`."""
+        query = (
+            select(Project.oid)
+            .join(Stage, Project.stage_id == Stage.oid)
+            .where(
+                Project.is_archived.is_(False),
+                Project.implementation_year < before_year,
+                Stage.probability.in_(PROJECT_CLOSED_PROBABILITIES),
+            )
+            .order_by(Project.oid)
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(Project.oid > after)
         result = await self.session.execute(query)
         return result.scalars().all()
 
-    async def get_analytics(
+    async def archive_state(self, id: IDType, lock: bool = False) -> Optional[Row]:
+        """`is_archived` и `archive_key` проекта; с `lock` — SELECT ... FOR UPDATE.
+
+        Блокировка держится до конца транзакции: правки проекта и вставки
+        дочерних строк (внешний ключ берёт KEY SHARE на проект) ждут, пока
+        архивация или восстановление не закончится.
+        """
+        query = select(Project.is_archived, Project.archive_key).where(
+            Project.oid == id
+        )
+        if lock:
+            query = query.with_for_update()
+        result = await self.session.execute(query)
+        return result.first()
+
+    async def export_archive(self, id: IDType) -> Dict[str, List[dict]]:
+        """Строки проекта (без вычисляемых колонок) и всех его дочерних таблиц."""
+        columns = [c for c in Project.__table__.c if c.computed is None]
+        result = await self.session.execute(select(*columns).where(Project.oid == id))
+        data = {"project": [dict(row) for row in result.mappings()]}
+        for name, model in _ARCHIVE_TABLES.items():
+            result = await self.session.execute(
+                select(model.__table__).where(model.project_id == id)
+            )
+            data[name] = [dict(row) for row in result.mappings()]
+        return data
+
+    async def archive_stub(self, id: IDType, key: str) -> None:
+        """Оставляет от проекта заглушку и фиксирует транзакцию.
+
+        Периоды сворачиваются по месяцам в project_archive_periods, дочерние
+        строки удаляются, длинные тексты очищаются. Сводка не пересчитывается
+        (`project_summary.skip`, а для архивных проектов её пропускает и сама
+        `project_summary_refresh`) — итоги проекта остаются в ней.
+        """
+        await self.session.execute(text("SET LOCAL project_summary.skip = 'on'"))
+        rollup = (
+            select(
+                FinancialPeriod.project_id,
+                FinancialPeriod.year,
+                FinancialPeriod.month,
+                func.sum(FinancialPeriod.revenue),
+                func.sum(FinancialPeriod.costs),
+            )
+            .where(FinancialPeriod.project_id == id)
+            .group_by(
+                FinancialPeriod.project_id, FinancialPeriod.year, FinancialPeriod.month
+            )
+        )
+        await self.session.execute(
+            insert(ProjectArchivePeriod).from_select(
+                ["project_id", "year", "month", "revenue", "costs"], rollup
+            )
+        )
+        for model in _ARCHIVE_TABLES.values():
+            await self.session.execute(
+                delete(model)
+                .where(model.project_id == id)
+                .execution_options(synchronize_session=False)
+            )
+        await self.session.execute(
+            update(Project)
+            .where(Project.oid == id)
+            .values(
+                is_archived=True,
+                archive_key=key,
+                update_at=func.now(),
+                version=Project.version + 1,
+                **dict.fromkeys(PROJECT_ARCHIVED_TEXTS),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.commit()
+
+    async def restore_archive(self, id: IDType, data: Dict[str, List[dict]]) -> None:
+        """Возвращает строки из архива (`export_archive`) и фиксирует транзакцию.
+
+        Дочерние строки вставляются без пересчёта сводки на каждую строку;
+        сводка пересчитывается один раз в конце.
+        """
+        await self.session.execute(text("SET LOCAL project_summary.skip = 'on'"))
+        project = data["project"][0]
+        await self.session.execute(
+            update(Project)
+            .where(Project.oid == id)
+            .values(
+                is_archived=False,
+                archive_key=None,
+                update_at=func.now(),
+                version=Project.version + 1,
+                **{name: project.get(name) for name in PROJECT_ARCHIVED_TEXTS},
+            )
+            .execution_options(synchronize_session=False)
+        )
+        for name, model in _ARCHIVE_TABLES.items():
+            if data[name]:
+                await self.session.execute(insert(model.__table__), data[name])
+        await self.session.execute(
+            delete(ProjectArchivePeriod).where(ProjectArchivePeriod.project_id == id)
+        )
+        await self.session.execute(
+            text("SELECT project_summary_refresh(ARRAY[CAST(:pid AS uuid)])"),
+            {"pid": id},
+        )
+        await self.session.commit()
+
+    async def patch(
+        self, id: IDType, values: dict, version: Optional[int] = None
+    ) -> Optional[PyUUID]:
+        """Частичное обновление проекта одним `UPDATE ... RETURNING`.
+
+        При смене этапа вероятность берётся из этапа в том же UPDATE
+        (некоррелированный подзапрос — InitPlan, считается один раз), а
+        несуществующий этап, как и несуществующий проект, даёт ноль строк.
+        `update_at` ставит БД, `version` увеличивается на 1. С `version`
+        строка обновляется, только если её версия всё ещё такая.
+
+        Returns:
+            oid обновлённого проекта или None, если проект или этап не найден.
+
+        Raises:
+            ResourceConflictError: проект уже изменён (версия не совпала).
+        """
+        values = {**values, "update_at": func.now(), "version": Project.version + 1}
+        query = update(Project).where(Project.oid == id)
+        if version is not None:
+            query = query.where(Project.version == version)
+        if "stage_id" in values:
+            probability = (
+                select(Stage.probability)
+                .where(Stage.oid == values["stage_id"])
+                .scalar_subquery()
+            )
+            query = query.where(probability.isnot(None))
+            values["probability"] = probability
+        query = (
+            query.values(**values)
+            .returning(Project.oid)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        oid = result.scalar_one_or_none()
+        await self.session.commit()
+        if oid is None and version is not None:
+            current = await self.session.scalar(
+                select(Project.version).where(Project.oid == id)
+            )
+            if current is not None and current != version:
+                raise ResourceConflictError()
+        return oid
+
+    async def _existing_references(
+        self, items: Sequence[dict]
+    ) -> Tuple[Dict[str, set], Dict[PyUUID, Decimal]]:
+        """Какие из упомянутых в `items` id справочников существуют.
+
+        По одному запросу на справочник, сколько бы ни было элементов.
+        Вероятности этапов возвращаются заодно — они нужны для записи.
+        """
+        found = {}
+        probabilities = {}
+        for field, model in PROJECT_REFERENCE_MODELS.items():
+            ids = {item[field] for item in items if item.get(field) is not None}
+            if not ids:
+                found[field] = set()
+                continue
+            if model is Stage:
+                result = await self.session.execute(
+                    select(Stage.oid, Stage.probability).where(Stage.oid.in_(ids))
+                )
+                probabilities = dict(result.tuples().all())
+                found[field] = set(probabilities)
+            else:
+                result = await self.session.execute(
+                    select(model.oid).where(model.oid.in_(ids))
+                )
+                found[field] = set(result.scalars().all())
+        return found, probabilities
+
+    @staticmethod
+    def _missing_references(item: dict, found: Dict[str, set]) -> List[str]:
+        return [
+            f"{field}: не найден"
+            for field, ids in found.items()
+            if item.get(field) is not None and item[field] not in ids
+        ]
+
+    async def reference_names(
+        self,
+    ) -> Tuple[Dict[str, Dict[str, PyUUID]], Dict[PyUUID, Decimal]]:
+        """Справочники целиком: имя в нижнем регистре → id, по полю проекта.
+
+        По одному запросу на таблицу; менеджеры сопоставляются по email.
+        Вторым значением — вероятности этапов.
+        """
+        names = {}
+        for field, model in PROJECT_REFERENCE_MODELS.items():
+            column = User.email if model is User else model.name
+            result = await self.session.execute(select(column, model.oid))
+            names[field] = {name.strip().lower(): oid for name, oid in result.tuples()}
+        result = await self.session.execute(select(Stage.oid, Stage.probability))
+        return names, dict(result.tuples().all())
+
+    async def insert_many(
+        self, items: Sequence[dict], probabilities: Dict[PyUUID, Decimal]
+    ) -> List[PyUUID]:
+        """INSERT (executemany) на все `items` и commit. Ссылки не проверяются.
+
+        Строки пишутся частями по `MAX_BIND_PARAMS` параметров, все в одной
+        транзакции.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                **item,
+                "oid": uuid7(),
+                "created_at": now,
+                "probability": probabilities[item["stage_id"]],
+            }
+            for item in items
+        ]
+        params_per_row = max(len(row) for row in rows)
+        for chunk in _chunked(rows, params_per_row):
+            await self.session.execute(insert(Project), chunk)
+        await self.session.commit()
+        return [row["oid"] for row in rows]
+
+    async def bulk_create(self, items: Sequence[dict]) -> List[dict]:
+        """Создаёт проекты пачкой: INSERT (executemany) в одной транзакции.
+
+        Элементы со ссылками на несуществующие справочники не вставляются,
+        для них в результате `status="error"` и список ошибок.
+        """
+        found, probabilities = await self._existing_references(items)
+        valid, results = [], []
+        for index, item in enumerate(items):
+            errors = self._missing_references(item, found)
+            if errors:
+                results.append({"index": index, "status": "error", "errors": errors})
+                continue
+            valid.append(item)
+            results.append({"index": index, "status": "created"})
+        if valid:
+            oids = iter(await self.insert_many(valid, probabilities))
+            for result in results:
+                if result["status"] == "created":
+                    result["oid"] = next(oids)
+        return results
+
+    async def bulk_update(self, items: Sequence[dict]) -> List[dict]:
+        """Частично обновляет проекты пачкой одним `UPDATE ... FROM (VALUES ...)`.
+
+        Каждый элемент — `oid`, `version`, которую видел клиент, и только
+        изменяемые поля. Строка VALUES несёт значения полей и флаги «поле
+        задано», поэтому элементы с разным набором полей обновляются одним
+        запросом (для большой пачки — несколькими, см. `_update_versioned`).
+        Обновляются только строки, чья версия всё ещё такая; по
+        вернувшимся oid видно, какие элементы не прошли, и только для них
+        одним SELECT выясняется, нет проекта или он уже изменён.
+        Несуществующие проекты и справочники, а также устаревшие версии
+        попадают в результат как ошибки; остальные элементы обновляются в
+        одной транзакции.
+        """
+        found, probabilities = await self._existing_references(items)
+        rows, results, seen = [], {}, set()
+        for index, item in enumerate(items):
+            errors = self._missing_references(item, found)
+            if item["oid"] in seen:
+                errors.insert(0, "oid: проект уже есть в этом запросе")
+            seen.add(item["oid"])
+            if errors:
+                results[index] = {
+                    "index": index, "oid": item["oid"], "status": "error", "errors": errors
+                }
+                continue
+            row = dict(item)
+            if "stage_id" in item:
+                row["probability"] = probabilities[item["stage_id"]]
+            rows.append((index, row))
+
+        updated = await self._update_versioned([row for _, row in rows]) if rows else set()
+        failed = {row["oid"] for _, row in rows} - updated
+        versions = {}
+        if failed:
+            result = await self.session.execute(
+                select(Project.oid, Project.version).where(Project.oid.in_(failed))
+            )
+            versions = dict(result.tuples().all())
+        await self.session.commit()
+
+        for index, row in rows:
+            if row["oid"] in updated:
+                results[index] = {"index": index, "oid": row["oid"], "status": "updated"}
+                continue
+            error = (
+                f"version: проект уже изменён, текущая версия {versions[row['oid']]}"
+                if row["oid"] in versions
+                else "oid: проект не найден"
+            )
+            results[index] = {
+                "index": index, "oid": row["oid"], "status": "error", "errors": [error]
+            }
+        return [results[index] for index in range(len(items))]
+
+    async def _update_versioned(self, rows: Sequence[dict]) -> set:
+        """`UPDATE projects p SET ... FROM (VALUES ...) v WHERE p.oid = v.oid
+        AND p.version = v.version RETURNING p.oid` для всех `rows`.
+
+        Незаданное в строке поле (`set_<поле>` = false) остаётся прежним.
+        На строку VALUES уходит 2 + 2 × полей параметров, поэтому большая
+        пачка выполняется несколькими такими UPDATE в той же транзакции.
+
+        Returns:
+            oid обновлённых проектов.
+        """
+        fields = sorted({key for row in rows for key in row} - {"oid", "version"})
+        updated = set()
+        # один параметр — `version + 1` в SET
+        for chunk in _chunked(rows, 2 + 2 * len(fields), reserved=1):
+            updated |= await self._update_versioned_chunk(chunk, fields)
+        return updated
+
+    async def _update_versioned_chunk(self, rows: Sequence[dict], fields: List[str]) -> set:
+        table = Project.__table__
+        source = values(
+            column("oid", table.c.oid.type),
+            column("version", table.c.version.type),
+            *(column(name, table.c[name].type) for name in fields),
+            *(column(f"set_{name}", Boolean) for name in fields),
+            name="v",
+        ).data(
+            [
+                (
+                    row["oid"],
+                    row["version"],
+                    *(row.get(name) for name in fields),
+                    *(name in row for name in fields),
+                )
+                for row in rows
+            ]
+        )
+        query = (
+            update(Project)
+            .where(Project.oid == source.c.oid, Project.version == source.c.version)
+            .values(
+                update_at=func.now(),
+                version=Project.version + 1,
+                **{
+                    # NULL в VALUES без типа: столбец из одних NULL был бы text
+                    name: case(
+                        (source.c[f"set_{name}"], cast(source.c[name], table.c[name].type)),
+                        else_=table.c[name],
+                    )
+                    for name in fields
+                },
+            )
+            .returning(Project.oid)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(query)
+        return set(result.scalars().all())
+
+    @staticmethod
+    def _copy_query(table, values: dict) -> Tuple[List[str], Select]:
+        """SELECT для `INSERT ... SELECT`: колонки `table`, часть заменена `values`."""
+        names = [c.key for c in table.c if c.key not in _CLONE_SKIP]
+        return names, select(*(values.get(name, table.c[name]) for name in names))
+
+    async def clone(
+        self,
+        id: IDType,
+        name: Optional[str] = None,
+        manager_id: Optional[PyUUID] = None,
+        shift_years: int = 0,
+        children: Iterable[str] = ("financial_periods",),
+    ) -> Optional[PyUUID]:
+        """Копирует проект и выбранные дочерние коллекции одним запросом.
+
+        Проект вставляется `INSERT ... SELECT ... RETURNING` в CTE, дочерние
+        строки — такими же INSERT в соседних CTE, которые берут новый oid
+        из первого: один запрос и одна транзакция, без выборки строк в
+        приложение. Год реализации, годы периодов и даты прогнозов
+        сдвигаются на `shift_years`, номер проекта не копируется. Архивный
+        проект не копируется.
+
+        Returns:
+            oid копии или None, если проекта (или нового менеджера) нет.
+        """
+        oid = uuid7()
+        project = Project.__table__
+        values = {
+            "oid": literal(oid, project.c.oid.type),
+            "created_at": func.now(),
+            "created_date": func.current_date(),
+            "implementation_year": project.c.implementation_year + shift_years,
+        }
+        conditions = [project.c.oid == id, project.c.is_archived.is_(False)]
+        if name is not None:
+            values["name"] = literal(name, project.c.name.type)
+        if manager_id is not None:
+            values["manager_id"] = literal(manager_id, project.c.manager_id.type)
+            conditions.append(exists().where(User.oid == manager_id))
+        names, source = self._copy_query(project, values)
+        copy = (
+            insert(project)
+            .from_select(names, source.where(*conditions))
+            .returning(project.c.oid)
+            .cte("project_copy")
+        )
+        query = select(copy.c.oid)
+
+        for child in children:
+            table = _ARCHIVE_TABLES[child].__table__
+            values = {
+                "oid": func.uuid_generate_v7(),
+                "project_id": copy.c.oid,
+                "created_at": func.now(),
+            }
+            if "year" in table.c:
+                values["year"] = table.c.year + shift_years
+            if "forecast_date" in table.c:
+                values["forecast_date"] = cast(
+                    table.c.forecast_date + func.make_interval(shift_years), Date
+                )
+            names, rows = self._copy_query(table, values)
+            rows = rows.select_from(table).join(copy, true()).where(
+                table.c.project_id == id
+            )
+            query = query.add_cte(
+                insert(table).from_select(names, rows).cte(f"{child}_copy")
+            )
+
+        result = await self.session.execute(query)
+        new_oid = result.scalar_one_or_none()
+        await self.session.commit()
+        return new_oid
+
+    @staticmethod
+    def _summary_query() -> Select:
+        """Проекция для списка: только нужные колонки и имена справочников.
+
+        Один запрос с JOIN вместо `select(Project)` + selectinload по связям,
+        без гидрации ORM-объектов.
+        """
+        return (
+            select(
+                Project.oid,
+                Project.name,
+                Project.organization_name,
+                Project.inn,
+                Project.project_number,
+                Project.implementation_year,
+                Project.stage_id,
+                Stage.name.label("stage"),
+                Project.service_id,
+                Service.name.label("service"),
+                Project.manager_id,
+                User.email.label("manager"),
+                Project.business_segment_id,
+                BusinessSegment.name.label("business_segment"),
+                Project.created_at,
+                Project.update_at,
+                Project.version,
+                Project.is_archived,
+                Project.probability,
+                ProjectSummary.total_revenue,
+                ProjectSummary.weighted_revenue,
+                ProjectSummary.last_activity_at,
+                ProjectSummary.last_stage_change_at,
+                ProjectSummary.comments_count,
+                ProjectSummary.history_count,
+            )
+            .join(Stage, Project.stage_id == Stage.oid)
+            .join(Service, Project.service_id == Service.oid)
+            .join(User, Project.manager_id == User.oid)
+            .outerjoin(
+                BusinessSegment, Project.business_segment_id == BusinessSegment.oid
+            )
+            .outerjoin(ProjectSummary, ProjectSummary.project_id == Project.oid)
+        )
+
+    async def list_page(
+        self,
+        filters: Optional[dict] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+    ) -> Tuple[Sequence[Row], Optional[str]]:
+        """Страница проектов, отсортированная по `sort` (см. `PROJECT_SORTS`).
+
+        Keyset по (значение сортировки, oid): у каждой сортировки есть
+        B-tree индекс с той же парой колонок, так что страница читается
+        диапазоном индекса при любом порядке.
+        """
+        column, tiebreaker = PROJECT_SORTS[sort]
+        query = self._scoped(self._apply_filters(self._summary_query(), filters))
+        # номер последнего изменения строки (проекта или сводки) — для ETag
+        change_seq = func.greatest(
+            Project.change_seq, func.coalesce(ProjectSummary.change_seq, 0)
+        )
+        query = query.add_columns(
+            column.label("sort_value"), change_seq.label("change_seq")
+        )
+        # курсор помнит сортировку и направление: чужой курсор — 400
+        sort_key = f"{sort}:{'desc' if descending else 'asc'}"
+        query = paginate(
+            query, [column, tiebreaker], limit, cursor, descending, sort_key
+        )
+        result = await self.session.execute(query)
+        return next_cursor(result.all(), limit, ["sort_value", "oid"], sort_key)
+
+    async def facets(self, filters: Optional[dict] = None) -> Dict[str, List[Row]]:
+        """Количество проектов по этапам, менеджерам, сегментам и услугам.
+
+        Один запрос с GROUPING SETS: каждая строка относится к одному набору,
+        какому — видно по `grouping()`. Пустой набор `()` даёт общий итог.
+        """
+        dimensions = {
+            "stage": (Project.stage_id, Stage.name),
+            "manager": (Project.manager_id, User.email),
+            "business_segment": (Project.business_segment_id, BusinessSegment.name),
+            "service": (Project.service_id, Service.name),
+        }
+        columns = []
+        for name, (id_column, name_column) in dimensions.items():
+            columns += [
+                id_column.label(f"{name}_id"),
+                name_column.label(f"{name}_name"),
+                func.grouping(id_column).label(f"{name}_grouping"),
+            ]
+        query = (
+            select(*columns, func.count().label("count"))
+            .select_from(Project)
+            .join(Stage, Project.stage_id == Stage.oid)
+            .join(Service, Project.service_id == Service.oid)
+            .join(User, Project.manager_id == User.oid)
+            .outerjoin(
+                BusinessSegment, Project.business_segment_id == BusinessSegment.oid
+            )
+            .group_by(
+                func.grouping_sets(
+                    *(tuple_(*pair) for pair in dimensions.values()), tuple_()
+                )
+            )
+        )
+        query = self._scoped(self._apply_filters(query, filters))
+        result = await self.session.execute(query)
+
+        facets = {name: [] for name in dimensions}
+        facets["total"] = 0
+        for row in result:
+            name = next(
+                (n for n in dimensions if getattr(row, f"{n}_grouping") == 0), None
+            )
+            if name is None:
+                facets["total"] = row.count
+                continue
+            facets[name].append(
+                {
+                    "id": getattr(row, f"{name}_id"),
+                    "name": getattr(row, f"{name}_name"),
+                    "count": row.count,
+                }
+            )
+        for name in dimensions:
+            facets[name].sort(key=lambda item: -item["count"])
+        return facets
+
+    async def changes(
+        self, since: Tuple[int, int] = (0, 0), limit: int = 500
+    ) -> Tuple[Sequence[Row], Sequence[Row], Sequence[Row], Tuple[int, int], bool]:
+        """Проекты и удаления с ключом `(change_xid, change_seq)` больше `since`.
+
+        Строка списка меняется и при правке проекта, и при пересчёте его
+        сводки, поэтому её ключ — наибольший из двух. Кандидаты отбираются
+        по индексам ключа обеих таблиц, удаления — из project_tombstones,
+        а для менеджера ещё и уходы проектов к другому менеджеру — из
+        project_scope_exits. Потоки сливаются по ключу, и в ответ попадают
+        первые `limit`.
+
+        INFO: номер change_seq выдаётся при записи, и транзакция с меньшим
+        номером может зафиксироваться позже, чем клиент прочитает больший.
+        Поэтому лента идёт по транзакциям: отдаются только изменения
+        транзакций старше горизонта — самой старой незавершённой
+        (`pg_snapshot_xmin`). Всё, что станет видно позже, получит ключ не
+        меньше горизонта и не окажется позади курсора.
+
+        Returns:
+            (изменённые, удалённые, ушедшие из области, новый since, есть ли ещё)
+        """
+        horizon = (
+            select(
+                cast(
+                    cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text),
+                    BigInteger,
+                )
+            )
+            .scalar_subquery()
+        )
+
+        # INFO: без явного типа значения курсора привязались бы как int4 —
+        # xid и номер изменения его перерастают
+        cursor = tuple_(*(literal(value, BigInteger) for value in since))
+
+        def newer(table) -> List:
+            key = tuple_(table.change_xid, table.change_seq)
+            return [key > cursor, table.change_xid < horizon]
+
+        changed = union(
+            self._scoped(select(Project.oid).where(*newer(Project))),
+            self._scoped_children(
+                select(ProjectSummary.project_id).where(*newer(ProjectSummary)),
+                ProjectSummary.project_id,
+            ),
+        ).subquery()
+        summary_newer = and_(
+            ProjectSummary.project_id.is_not(None),
+            tuple_(ProjectSummary.change_xid, ProjectSummary.change_seq)
+            > tuple_(Project.change_xid, Project.change_seq),
+        )
+        xid = case(
+            (summary_newer, ProjectSummary.change_xid), else_=Project.change_xid
+        ).label("change_xid")
+        seq = case(
+            (summary_newer, ProjectSummary.change_seq), else_=Project.change_seq
+        ).label("change_seq")
+        query = (
+            self._scoped(self._summary_query())
+            .add_columns(xid, seq)
+            .where(Project.oid.in_(select(changed.c.oid)))
+            # строка целиком ждёт, пока обе её части не окажутся за горизонтом
+            .where(xid < horizon)
+            .order_by(xid, seq)
+            .limit(limit + 1)
+        )
+        updated = (await self.session.execute(query)).all()
+        deleted = await self._change_events(ProjectTombstone, newer, limit)
+        # INFO: ADMIN видит все проекты, и уходов из области у него нет
+        left = (
+            await self._change_events(ProjectScopeExit, newer, limit)
+            if self.manager_scope is not None
+            else []
+        )
+
+        merged = heapq.merge(
+            (((row.change_xid, row.change_seq), 0, row) for row in updated),
+            (((row.change_xid, row.change_seq), 1, row) for row in deleted),
+            (((row.change_xid, row.change_seq), 2, row) for row in left),
+            key=lambda entry: entry[0],
+        )
+        page = list(itertools.islice(merged, limit))
+        has_more = len(updated) + len(deleted) + len(left) > len(page)
+        next_since = page[-1][0] if page else tuple(since)
+        return (
+            [row for _, kind, row in page if kind == 0],
+            [row for _, kind, row in page if kind == 1],
+            [row for _, kind, row in page if kind == 2],
+            next_since,
+            has_more,
+        )
+
+    async def _change_events(self, table, newer, limit: int) -> Sequence[Row]:
+        """Удаления или уходы из области (`table`) для ленты изменений —
+        менеджеру только его собственные."""
+        query = (
+            select(table.project_id, table.change_xid, table.change_seq)
+            .where(*newer(table))
+            .order_by(table.change_xid, table.change_seq)
+            .limit(limit + 1)
+        )
+        if self.manager_scope is not None:
+            query = query.where(table.manager_id == self.manager_scope)
+        return (await self.session.execute(query)).all()
+
+    @staticmethod
+    def _organizations_query() -> Select:
+        projects = func.count().label("projects")
+        return (
+            select(Project.organization_name, Project.inn, projects)
+            .group_by(Project.organization_name, Project.inn)
+            .order_by(projects.desc(), Project.organization_name, Project.inn)
+        )
+
+    async def top_organizations(self, limit: int) -> Sequence[Row]:
+        """Организации с ИНН по числу проектов, самые частые первыми."""
+        result = await self.session.execute(self._organizations_query().limit(limit))
+        return result.all()
+
+    async def suggest_organizations(self, prefix: str, limit: int) -> Sequence[Row]:
+        """Организации, у которых `lower(название)` или ИНН начинается с `prefix`.
+
+        Шаблон `LIKE 'префикс%'` закрыт индексами `*_prefix`
+        (text_pattern_ops): они работают при любой локали БД.
+        """
+        pattern = (
+            prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        )
+        query = self._organizations_query().where(
+            func.lower(Project.organization_name).like(pattern, escape="\\")
+            | Project.inn.like(pattern, escape="\\")
+        )
+        result = await self.session.execute(query.limit(limit))
+        return result.all()
+
+    @staticmethod
+    def _duplicate_matches(organization_name, inn, service_id, limit: int, exclude=None):
+        """Вероятные дубли одной организации — LATERAL-подзапрос к строке кандидата.
+
+        Блокирующий ключ — похожий `organization_key` (оператор `%`) или тот
+        же ИНН: оба условия закрыты индексами, и с кандидатом сравниваются
+        только найденные по ним проекты, а не все. Сначала проекты той же
+        услуги, затем по оценке.
+        """
+        key = func.normalize_organization_name(organization_name)
+        same_inn = func.coalesce(Project.inn == inn, False)
+        same_service = Project.service_id.is_not_distinct_from(service_id)
+        score = case(
+            (same_inn, 1.0), else_=func.similarity(Project.organization_key, key)
+        )
+        query = select(
+            Project.oid.label("project_id"),
+            Project.name,
+            Project.organization_name,
+            Project.inn,
+            Project.service_id,
+            score.label("score"),
+            same_inn.label("same_inn"),
+            same_service.label("same_service"),
+        ).where(
+            Project.organization_key.bool_op("%")(key) | (Project.inn == inn),
+            score >= DUPLICATE_MIN_SCORE,
+        )
+        if exclude is not None:
+            query = query.where(exclude)
+        return (
+            query.order_by(same_service.desc(), score.desc(), Project.oid)
+            .limit(limit)
+            .lateral("match")
+        )
+
+    async def find_duplicates(
+        self, items: Sequence[dict], limit: int = DUPLICATE_LIMIT
+    ) -> Dict[int, List[Row]]:
+        """Вероятные дубли для каждого из новых проектов `items` одним запросом.
+
+        Returns:
+            Индекс в `items` → дубли, самые вероятные первыми. Элементов без
+            дублей в словаре нет.
+        """
+        if not items:
+            return {}
+
+        def column(name: str, type_):
+            values = [item.get(name) for item in items]
+            return cast(literal(values, ARRAY(type_)), ARRAY(type_))
+
+        candidates = (
+            func.unnest(
+                column("organization_name", Text),
+                column("inn", Text),
+                column("service_id", Uuid),
+            )
+            .table_valued("organization_name", "inn", "service_id", with_ordinality="idx")
+            .render_derived("candidates")
+        )
+        match = self._duplicate_matches(
+            candidates.c.organization_name,
+            candidates.c.inn,
+            candidates.c.service_id,
+            limit,
+        )
+        query = (
+            select(candidates.c.idx, *match.c)
+            .select_from(candidates.join(match, true()))
+            .order_by(candidates.c.idx)
+        )
+        found: Dict[int, List[Row]] = {}
+        for row in (await self.session.execute(query)).all():
+            # WITH ORDINALITY нумерует с 1
+            found.setdefault(row.idx - 1, []).append(row)
+        return found
+
+    async def duplicate_pairs(
+        self, oids: Sequence[PyUUID], limit: int = DUPLICATE_LIMIT
+    ) -> Sequence[Row]:
+        """Пары вероятных дублей для проектов `oids`.
+
+        Проект сравнивается только с проектами с бо́льшим oid: каждая пара
+        находится один раз, когда обходятся все проекты по порядку.
+        """
+        source = aliased(Project, name="source")
+        match = self._duplicate_matches(
+            source.organization_name,
+            source.inn,
+            source.service_id,
+            limit,
+            exclude=Project.oid > source.oid,
+        )
+        query = (
+            select(
+                source.oid,
+                source.organization_name,
+                match.c.project_id.label("duplicate_id"),
+                match.c.organization_name.label("duplicate_organization_name"),
+                match.c.score,
+            )
+            .select_from(source)
+            .join(match, true())
+            .where(source.oid.in_(oids))
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    async def search(
+        self,
+        q: str,
+        filters: Optional[dict] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Sequence[Row]:
+        """Полнотекстовый поиск с нечётким совпадением по организации.
+
+        Строка разбирается `websearch_to_tsquery` (кавычки, `-слово`, `or`) и
+        ищется в `search_vector`; организации дополнительно сравниваются по
+        триграммам (`%`), чтобы находились и с опечатками. Оба условия
+        закрыты GIN-индексами. Ранг — лучший из ts_rank_cd и similarity.
+        """
+        tsquery = func.websearch_to_tsquery(literal_column("'russian'"), q)
+        rank = func.greatest(
+            func.ts_rank_cd(Project.search_vector, tsquery),
+            func.similarity(Project.organization_name, q),
+        ).label("rank")
+        query = (
+            self._summary_query()
+            .add_columns(rank)
+            .where(
+                Project.search_vector.bool_op("@@")(tsquery)
+                | Project.organization_name.bool_op("%")(q)
+            )
+        )
+        query = (
+            self._scoped(self._apply_filters(query, filters))
+            .order_by(rank.desc(), Project.oid)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.session.execute(query)
+        return result.all()
+
+    def _registry_query(
+        self,
+        start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    ) -> Select:
+        """Реестр проектов одним агрегирующим запросом.
+
+        Без окна дат выручка берётся из `project_summaries`, которую
+        поддерживают триггеры. С окном `start_date..end_date` выручка
+        суммируется по финансовым периодам окна (по году и месяцу) вместе
+        со свёрткой периодов архивных проектов, изменения —
+        по истории за то же окно. Агрегации — подзапросы с GROUP BY
+        project_id, присоединённые к проектам; в Python ничего не считается.
+        """
+        change = func.concat(
+            ProjectHistory.field_changed,
+            ": ",
+            func.coalesce(ProjectHistory.old_value, "—"),
+            " → ",
+            func.coalesce(ProjectHistory.new_value, "—"),
+        )
+        changes = select(
+            ProjectHistory.project_id,
+            func.array_agg(aggregate_order_by(change, ProjectHistory.changed_at)).label(
+                "changes"
+            ),
+        ).group_by(ProjectHistory.project_id)
+        if start_date:
+            changes = changes.where(ProjectHistory.changed_at >= start_date)
+        if end_date:
+            changes = changes.where(ProjectHistory.changed_at <= end_date)
+        changes = self._scoped_children(changes, ProjectHistory.project_id).subquery()
+
+        if start_date or end_date:
+            # у архивных проектов периоды свёрнуты в project_archive_periods
+            periods = []
+            for model in (FinancialPeriod, ProjectArchivePeriod):
+                period = tuple_(model.year, model.month)
+                rows = select(model.project_id, model.revenue).where(
+                    model.revenue.isnot(None)
+                )
+                if start_date:
+                    rows = rows.where(
+                        period >= tuple_(start_date.year, start_date.month)
+                    )
+                if end_date:
+                    rows = rows.where(period <= tuple_(end_date.year, end_date.month))
+                periods.append(self._scoped_children(rows, model.project_id))
+            periods = union_all(*periods).subquery()
+            revenue = (
+                select(
+                    periods.c.project_id,
+                    func.sum(periods.c.revenue).label("total_revenue"),
+                )
+                .group_by(periods.c.project_id)
+                .subquery()
+            )
+        else:
+            revenue = ProjectSummary.__table__
+
+        total_revenue = func.coalesce(revenue.c.total_revenue, 0)
+        query = (
+            select(
+                Project.oid.label("project_id"),
+                BusinessSegment.name.label("segment"),
+                Project.inn,
+                Project.organization_name,
+                Project.name,
+                Stage.name.label("stage"),
+                Project.implementation_year,
+                Service.name.label("service"),
+                User.email.label("manager"),
+                total_revenue.label("total_revenue"),
+                (total_revenue * func.coalesce(Project.probability, 0) / 100).label(
+                    "weighted_revenue"
+                ),
+                func.coalesce(
+                    changes.c.changes, cast(array([], type_=Text), ARRAY(Text))
+                ).label("changes"),
+            )
+            .join(Stage, Project.stage_id == Stage.oid)
+            .join(Service, Project.service_id == Service.oid)
+            .join(User, Project.manager_id == User.oid)
+            .outerjoin(
+                BusinessSegment, Project.business_segment_id == BusinessSegment.oid
+            )
+            .outerjoin(revenue, revenue.c.project_id == Project.oid)
+            .outerjoin(changes, changes.c.project_id == Project.oid)
+            .order_by(Project.organization_name, Project.oid)
+        )
+        return self._scoped(query)
+
+    async def get_project_registry(
         self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    ) -> Sequence[Row]:
+        result = await self.session.execute(
+            self._registry_query(start_date, end_date)
+        )
+        return result.all()
+
+    async def stream_project_registry(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Row]:
+        """Тот же реестр, но через серверный курсор: строки читаются из БД
+        пачками по `batch_size`, и в памяти одновременно лежит одна пачка."""
+        result = await self.session.stream(
+            self._registry_query(start_date, end_date).execution_options(
+                yield_per=batch_size
+            )
+        )
+        async for row in result:
+            yield row
+
+    async def get_analytics(
+        self,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        concurrent: bool = True,
     ) -> Dict:
+        """Сводная аналитика по проектам в области видимости (scope_to).
+
+        Запросы независимы, поэтому по умолчанию выполняются параллельно
+        (см. `_fetch_concurrently`); `concurrent=False` или занятые слоты
+        `ANALYTICS_PARALLEL_RUNS` — по очереди в сессии репозитория.
+        """
         # Общее кол-во и выручка
+        # INFO: выручка — из project_summaries: сводка есть и у архивных
+        # проектов, чьих финансовых периодов в БД уже нет.
         query_total = select(func.count()).select_from(Project)
-        query_revenue = select(func.sum(FinancialPeriod.revenue)).where(
-            FinancialPeriod.revenue.isnot(None)
-        )
+        query_revenue = select(func.sum(ProjectSummary.total_revenue))
 
         # По стадиям, менеджерам, услугам, сегментам
         query_by_stage = (
-            select(Project.stage_id, Stage.stage_name, func.count())
-            .join(Stage)
-            .group_by(Project.stage_id, Stage.stage_name)
+            select(Project.stage_id, Stage.name, func.count())
+            .join(Stage, Project.stage_id == Stage.oid)
+            .group_by(Project.stage_id, Stage.name)
         )
         query_by_manager = (
-            select(Project.manager_id, User.name, func.count())
-            .join(User)
-            .group_by(Project.manager_id, User.name)
+            select(Project.manager_id, User.email, func.count())
+            .join(User, Project.manager_id == User.oid)
+            .group_by(Project.manager_id, User.email)
         )
         query_by_service = (
-            select(Project.service_id, Service.service_name, func.count())
-            .join(Service)
-            .group_by(Project.service_id, Service.service_name)
+            select(Project.service_id, Service.name, func.count())
+            .join(Service, Project.service_id == Service.oid)
+            .group_by(Project.service_id, Service.name)
         )
         query_by_segment = (
             select(Project.business_segment_id, BusinessSegment.name, func.count())
@@ -87,108 +1410,145 @@ class ProjectRepository(BaseRepository[Project]):
 
         # Сумма по менеджерам/сегментам/услугам
         query_revenue_by_manager = (
-            select(Project.manager_id, User.name, func.sum(FinancialPeriod.revenue))
-            .join(FinancialPeriod)
-            .join(User)
-            .where(FinancialPeriod.revenue.isnot(None))
-            .group_by(Project.manager_id, User.name)
+            select(Project.manager_id, User.email, func.sum(ProjectSummary.total_revenue))
+            .join(ProjectSummary, ProjectSummary.project_id == Project.oid)
+            .join(User, Project.manager_id == User.oid)
+            .group_by(Project.manager_id, User.email)
         )
         query_revenue_by_segment = (
             select(
                 Project.business_segment_id,
                 BusinessSegment.name,
-                func.sum(FinancialPeriod.revenue),
+                func.sum(ProjectSummary.total_revenue),
             )
-            .join(FinancialPeriod)
-            .join(BusinessSegment)
-            .where(FinancialPeriod.revenue.isnot(None))
+            .join(ProjectSummary, ProjectSummary.project_id == Project.oid)
+            .join(BusinessSegment, Project.business_segment_id == BusinessSegment.oid)
             .group_by(Project.business_segment_id, BusinessSegment.name)
         )
         query_revenue_by_service = (
             select(
                 Project.service_id,
-                Service.service_name,
-                func.sum(FinancialPeriod.revenue),
+                Service.name,
+                func.sum(ProjectSummary.total_revenue),
             )
-            .join(FinancialPeriod)
-            .join(Service)
-            .where(FinancialPeriod.revenue.isnot(None))
-            .group_by(Project.service_id, Service.service_name)
+            .join(ProjectSummary, ProjectSummary.project_id == Project.oid)
+            .join(Service, Project.service_id == Service.oid)
+            .group_by(Project.service_id, Service.name)
         )
 
-        # Среднее время на стадии
-        query_avg_stage_time = (
+        # Среднее время на стадии: от перехода на стадию до следующего
+        # перехода. Оконная функция — в подзапросе, avg от неё считать нельзя.
+        stage_changes = self._scoped_children(
             select(
                 ProjectHistory.new_value,
-                Stage.stage_name,
-                func.avg(
-                    ProjectHistory.changed_at
-                    - func.lag(ProjectHistory.changed_at).over(
+                (
+                    func.lead(ProjectHistory.changed_at).over(
                         partition_by=ProjectHistory.project_id,
                         order_by=ProjectHistory.changed_at,
                     )
-                ).label("avg_time"),
-            )
-            .join(Stage, ProjectHistory.new_value == Stage.oid)
-            .where(ProjectHistory.field_changed == "stage_id")
-            .group_by(ProjectHistory.new_value, Stage.stage_name)
+                    - ProjectHistory.changed_at
+                ).label("duration"),
+            ).where(ProjectHistory.field_changed == "stage_id"),
+            ProjectHistory.project_id,
+        ).subquery("stage_changes")
+        query_avg_stage_time = (
+            select(Stage.oid, Stage.name, func.avg(stage_changes.c.duration))
+            # new_value — текст, oid этапа в нём строкой
+            .join(stage_changes, stage_changes.c.new_value == cast(Stage.oid, Text))
+            .group_by(Stage.oid, Stage.name)
         )
 
         # Выручка с учетом вероятности
-        query_weighted_revenue = (
-            select(Project.oid, func.sum(FinancialPeriod.revenue * Project.probability))
-            .join(FinancialPeriod)
-            .where(FinancialPeriod.revenue.isnot(None))
-            .group_by(Project.oid)
-        )
-
-        total = (await self.session.execute(query_total)).scalar() or 0
-        revenue = (await self.session.execute(query_revenue)).scalar() or 0
-        by_stage = (await self.session.execute(query_by_stage)).all()
-        by_manager = (await self.session.execute(query_by_manager)).all()
-        by_service = (await self.session.execute(query_by_service)).all()
-        by_segment = (await self.session.execute(query_by_segment)).all()
-        revenue_by_manager = (
-            await self.session.execute(query_revenue_by_manager)
-        ).all()
-        revenue_by_segment = (
-            await self.session.execute(query_revenue_by_segment)
-        ).all()
-        revenue_by_service = (
-            await self.session.execute(query_revenue_by_service)
-        ).all()
-        avg_stage_time = (await self.session.execute(query_avg_stage_time)).all()
-        weighted_revenue = (await self.session.execute(query_weighted_revenue)).all()
+        query_weighted_revenue = select(
+            ProjectSummary.project_id, ProjectSummary.weighted_revenue
+        ).where(ProjectSummary.total_revenue != 0)
+
+        # Область видимости (scope_to) — в каждый запрос
+        (
+            query_total,
+            query_by_stage,
+            query_by_manager,
+            query_by_service,
+            query_by_segment,
+            query_revenue_by_manager,
+            query_revenue_by_segment,
+            query_revenue_by_service,
+        ) = map(
+            self._scoped,
+            (
+                query_total,
+                query_by_stage,
+                query_by_manager,
+                query_by_service,
+                query_by_segment,
+                query_revenue_by_manager,
+                query_revenue_by_segment,
+                query_revenue_by_service,
+            ),
+        )
+        query_revenue = self._scoped_children(query_revenue, ProjectSummary.project_id)
+        query_weighted_revenue = self._scoped_children(
+            query_weighted_revenue, ProjectSummary.project_id
+        )
+
+        # самые тяжёлые — первыми, чтобы не достались последнему свободному
+        # соединению
+        queries = {
+            "avg_stage_time": query_avg_stage_time,
+            "weighted_revenue": query_weighted_revenue,
+            "revenue_by_manager": query_revenue_by_manager,
+            "revenue_by_segment": query_revenue_by_segment,
+            "revenue_by_service": query_revenue_by_service,
+            "by_stage": query_by_stage,
+            "by_manager": query_by_manager,
+            "by_service": query_by_service,
+            "by_segment": query_by_segment,
+            "total": query_total,
+            "revenue": query_revenue,
+        }
+        if (
+            concurrent
+            and self.session.bind.dialect.name == "postgresql"
+            and not _analytics_runs.locked()
+        ):
+            async with _analytics_runs:
+                rows = await self._fetch_concurrently(queries)
+        else:
+            rows = {
+                name: (await self.session.execute(query)).all()
+                for name, query in queries.items()
+            }
 
         return {
-            "total_projects": total,
-            "total_revenue": float(revenue),
+            "total_projects": rows["total"][0][0] or 0,
+            "total_revenue": float(rows["revenue"][0][0] or 0),
             "by_stage": [
-                {"stage_id": s[0], "stage_name": s[1], "count": s[2]} for s in by_stage
+                {"stage_id": s[0], "stage_name": s[1], "count": s[2]}
+                for s in rows["by_stage"]
             ],
             "by_manager": [
                 {"manager_id": m[0], "manager_name": m[1], "count": m[2]}
-                for m in by_manager
+                for m in rows["by_manager"]
             ],
             "by_service": [
                 {"service_id": s[0], "service_name": s[1], "count": s[2]}
-                for s in by_service
+                for s in rows["by_service"]
             ],
             "by_segment": [
                 {"segment_id": s[0], "segment_name": s[1], "count": s[2]}
-                for s in by_segment
+                for s in rows["by_segment"]
             ],
             "revenue_by_manager": [
                 {"manager_id": m[0], "manager_name": m[1], "revenue": float(m[2] or 0)}
-                for m in revenue_by_manager
+                for m in rows["revenue_by_manager"]
             ],
             "revenue_by_segment": [
                 {"segment_id": s[0], "segment_name": s[1], "revenue": float(s[2] or 0)}
-                for s in revenue_by_segment
+                for s in rows["revenue_by_segment"]
             ],
             "revenue_by_service": [
                 {"service_id": s[0], "service_name": s[1], "revenue": float(s[2] or 0)}
-                for s in revenue_by_service
+                for s in rows["revenue_by_service"]
             ],
             "avg_stage_time": [
                 {
@@ -196,10 +1556,64 @@ class ProjectRepository(BaseRepository[Project]):
                     "stage_name": t[1],
                     "avg_days": t[2].total_seconds() / 86400 if t[2] else 0,
                 }
-                for t in avg_stage_time
+                for t in rows["avg_stage_time"]
             ],
             "weighted_revenue_by_project": [
                 {"project_id": w[0], "weighted_revenue": float(w[1] or 0)}
-                for w in weighted_revenue
+                for w in rows["weighted_revenue"]
             ],
         }
+
+    async def _fetch_concurrently(
+        self, queries: Dict[str, Select]
+    ) -> Dict[str, Sequence[Row]]:
+        """Выполняет запросы на нескольких соединениях пула в одном снимке БД.
+
+        INFO: соединение-экспортёр открывает REPEATABLE READ транзакцию и
+        отдаёт её снимок (`pg_export_snapshot`). Не больше
+        `ANALYTICS_CONCURRENCY` рабочих соединений импортируют его
+        (`SET TRANSACTION SNAPSHOT`) и разбирают запросы из общей очереди.
+        Все запросы видят одни и те же данные, как при последовательном
+        выполнении в одной транзакции, а время ответа близко к самому
+        медленному запросу. Экспортёр держит транзакцию, пока работают
+        остальные: без неё снимок не импортировать.
+        """
+        engine = self.session.bind
+        pending = deque(queries.items())
+        rows: Dict[str, Sequence[Row]] = {}
+
+        async def snapshot_connection(connection: AsyncConnection) -> AsyncConnection:
+            return await connection.execution_options(
+                isolation_level="REPEATABLE READ", postgresql_readonly=True
+            )
+
+        async with engine.connect() as exporter:
+            exporter = await snapshot_connection(exporter)
+            snapshot = (
+                await exporter.execute(text("SELECT pg_export_snapshot()"))
+            ).scalar_one()
+
+            async def worker() -> None:
+                async with engine.connect() as connection:
+                    connection = await snapshot_connection(connection)
+                    # идентификатор снимка — от самой БД; параметры в SET нельзя
+                    await connection.execute(
+                        text(f"SET TRANSACTION SNAPSHOT '{snapshot}'")
+                    )
+                    while pending:
+                        name, query = pending.popleft()
+                        rows[name] = (await connection.execute(query)).all()
+                    await connection.rollback()
+
+            # INFO: TaskGroup, а не голый gather: при ошибке одного запроса
+            # остальные отменяются и соединения возвращаются в пул сразу
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for _ in range(min(ANALYTICS_CONCURRENCY, len(pending))):
+                        group.create_task(worker())
+            except ExceptionGroup as errors:
+                # наружу — первая ошибка как есть, чтобы её разобрали
+                # обычные обработчики (ошибки БД, ApplicationError)
+                raise errors.exceptions[0]
+            await exporter.rollback()
+        return rows
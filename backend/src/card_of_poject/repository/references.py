@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional, Sequence, Tuple
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 from src.card_of_poject.model import (
     BusinessSegment,
     Comment,
@@ -13,6 +13,7 @@ from src.card_of_poject.model import (
     Stage,
 )
 from src.card_of_poject.repository.base_repository import BaseRepository, IDType
+from src.core.pagination import next_cursor, paginate
 
 
 class StageRepository(BaseRepository[Stage]):
@@ -80,3 +81,15 @@ class CommentRepository(BaseRepository[Comment]):
         )
         result = await self.session.execute(query)
         return result.scalars().all()
+
+    async def list_page(
+        self, project_id: IDType, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[Sequence[Comment], Optional[str]]:
+        query = (
+            select(Comment)
+            .where(Comment.project_id == project_id)
+            .options(joinedload(Comment.author))
+        )
+        query = paginate(query, [Comment.created_at, Comment.oid], limit, cursor)
+        result = await self.session.execute(query)
+        return next_cursor(result.scalars().all(), limit, ["created_at", "oid"])
@@ -18,4 +18,12 @@ class ReferenceResponse(ReferenceBase):
         from_attributes = True
 
 
+class UserShortResponse(BaseModel):
+    oid: PyUUID
+    email: str
+
+    class Config:
+        from_attributes = True
+
+
 # INFO: для спрвочников и общих данных
@@ -1,9 +1,9 @@
 from pydantic import BaseModel
 from uuid import UUID as PyUUID
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
-from src.card_of_poject.schemas.base import ReferenceResponse
+from src.card_of_poject.schemas.base import UserShortResponse
 
 
 class CommentBase(BaseModel):
@@ -19,7 +19,12 @@ class CommentCreate(CommentBase):
 class CommentResponse(CommentBase):
     oid: PyUUID
     created_at: datetime
-    author: ReferenceResponse  # User.name
+    author: UserShortResponse
 
     class Config:
         from_attributes = True
+
+
+class CommentPageResponse(BaseModel):
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None
@@ -1,9 +1,9 @@
 from pydantic import BaseModel
 from uuid import UUID as PyUUID
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
-from src.card_of_poject.schemas.base import ReferenceResponse
+from src.card_of_poject.schemas.base import UserShortResponse
 
 
 class ProjectHistoryBase(BaseModel):
@@ -21,12 +21,17 @@ class ProjectHistoryCreate(ProjectHistoryBase):
 class ProjectHistoryResponse(ProjectHistoryBase):
     oid: PyUUID
     changed_at: datetime
-    changed_by: ReferenceResponse  # User.name
+    changed_by: UserShortResponse
 
     class Config:
         from_attributes = True
 
 
+class ProjectHistoryPageResponse(BaseModel):
+    items: List[ProjectHistoryResponse]
+    next_cursor: Optional[str] = None
+
+
 class StageChangeResponse(BaseModel):
     stage_name: str
     changed_at: datetime
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from uuid import UUID as PyUUID
 from datetime import datetime
+from typing import List, Optional
 
 
 class ProjectPredictionBase(BaseModel):
@@ -19,3 +20,8 @@ class ProjectPredictionResponse(ProjectPredictionBase):
 
     class Config:
         from_attributes = True
+
+
+class ProjectPredictionPageResponse(BaseModel):
+    items: List[ProjectPredictionResponse]
+    next_cursor: Optional[str] = None
@@ -1,9 +1,9 @@
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator
 from uuid import UUID as PyUUID
-from typing import Optional, List, Dict, Union
+from typing import Literal, Optional, List, Dict, Union
 from datetime import datetime
 
-from src.card_of_poject.schemas.base import ReferenceResponse
+from src.card_of_poject.schemas.base import UserShortResponse
 from src.card_of_poject.schemas.comment import CommentResponse
 from src.card_of_poject.schemas.financial import FinancialPeriodResponse
 from src.card_of_poject.schemas.history import ProjectHistoryResponse
@@ -32,19 +32,18 @@ class ProjectBase(BaseModel):
     current_status: Optional[str] = None
     completed_this_period: Optional[str] = None
     plans_next_period: Optional[str] = None
-    probability: Optional[float] = None
 
     @field_validator("accepted_for_evaluation_id")
-    def check_evaluation(cls, v, values):
-        if values.get("is_forecast_accepted") and not v:
+    def check_evaluation(cls, v, info):
+        if info.data.get("is_forecast_accepted") and not v:
             raise ValueError(
                 "accepted_for_evaluation_id required when is_forecast_accepted is True"
             )
         return v
 
     @field_validator("industry_manager")
-    def check_industry_manager(cls, v, values):
-        if values.get("is_industry_solution") and not v:
+    def check_industry_manager(cls, v, info):
+        if info.data.get("is_industry_solution") and not v:
             raise ValueError(
                 "industry_manager required when is_industry_solution is True"
             )
@@ -64,24 +63,237 @@ class ProjectUpdate(ProjectBase):
     payment_type_id: Optional[PyUUID] = None
     business_segment_id: Optional[PyUUID] = None
 
+    # INFO: поле можно не передавать, но явный null для обязательной
+    # колонки проекта — ошибка запроса, а не NOT NULL в БД
+    @field_validator("name", "organization_name", "service_id", "manager_id", "stage_id")
+    def check_not_null(cls, v):
+        if v is None:
+            raise ValueError("field cannot be null")
+        return v
+
+
+# INFO: верхняя граница пачки. Запрос к БД ограничен 32767 параметрами,
+# поэтому репозиторий режет пачку на части (MAX_BIND_PARAMS); проверка —
+# `make check-bulk`
+PROJECT_BULK_LIMIT = 5000
+
+
+class ProjectBulkCreate(BaseModel):
+    items: List[ProjectCreate] = Field(..., min_length=1, max_length=PROJECT_BULK_LIMIT)
+
+
+class ProjectBulkUpdateItem(ProjectUpdate):
+    oid: PyUUID
+    version: int  # версия, которую видел клиент
+
+
+class ProjectBulkUpdate(BaseModel):
+    items: List[ProjectBulkUpdateItem] = Field(
+        ..., min_length=1, max_length=PROJECT_BULK_LIMIT
+    )
+
+
+class ProjectBulkItemResult(BaseModel):
+    index: int
+    oid: Optional[PyUUID] = None
+    status: Literal["created", "updated", "error"]
+    errors: List[str] = []
+
+
+class ProjectBulkResponse(BaseModel):
+    items: List[ProjectBulkItemResult]
+
+
+class ProjectImportRowError(BaseModel):
+    row: int  # номер строки в файле, заголовок — строка 1
+    errors: List[str]
+
+
+class ProjectDuplicate(BaseModel):
+    """Существующий проект, похожий на новый."""
+
+    project_id: PyUUID
+    name: str
+    organization_name: str
+    inn: Optional[str] = None
+    service_id: PyUUID
+    # 1 — тот же ИНН, иначе сходство названий организаций (0..1)
+    score: float
+    same_inn: bool
+    same_service: bool
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectImportRowDuplicates(BaseModel):
+    row: int
+    duplicates: List[ProjectDuplicate]
+
+
+class ProjectImportResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    errors: List[ProjectImportRowError]
+    # созданные строки, похожие на уже существующие проекты
+    duplicates: List[ProjectImportRowDuplicates] = []
+
+
+class ProjectCloneRequest(BaseModel):
+    """Параметры копии проекта; незаданные поля берутся из исходного."""
+
+    name: Optional[str] = None
+    manager_id: Optional[PyUUID] = None
+    # на сколько лет сдвинуть год реализации, периоды и даты прогнозов
+    shift_years: int = Field(0, ge=-100, le=100)
+    children: List[Literal["financial_periods", "predictions"]] = [
+        "financial_periods"
+    ]
+
+
+class PurgeJobResponse(BaseModel):
+    oid: PyUUID
+    project_id: PyUUID
+    status: str
+    total: int
+    deleted: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectChildTotals(BaseModel):
+    history: int
+    comments: int
+    predictions: int
+
+    class Config:
+        from_attributes = True
+
 
 class ProjectResponse(ProjectBase):
     oid: PyUUID
+    version: int
+    # вероятность этапа: ставится сервером при создании и смене этапа
+    probability: Optional[float] = None
+    # INFO: у архивного проекта нет дочерних строк и длинных текстов,
+    # вернуть их — POST /projects/{oid}/restore
+    is_archived: bool = False
     created_at: datetime
-    updated_at: Optional[datetime]
+    update_at: Optional[datetime] = None
     service: ServiceResponse
-    manager: ReferenceResponse
+    manager: UserShortResponse
     stage: StageResponse
-    business_segment: BusinessSegmentResponse
-    financial_periods: List[FinancialPeriodResponse]
-    history: List[ProjectHistoryResponse]
-    comments: List[CommentResponse]
-    predictions: List[ProjectPredictionResponse]
+    business_segment: Optional[BusinessSegmentResponse] = None
+    # INFO: заполняются только связи, перечисленные в `expand`.
+    # history/comments/predictions — последние N записей, полные списки
+    # доступны постранично по ссылкам из `links`.
+    financial_periods: List[FinancialPeriodResponse] = []
+    history: List[ProjectHistoryResponse] = Field(
+        default=[], validation_alias="latest_history"
+    )
+    comments: List[CommentResponse] = Field(
+        default=[], validation_alias="latest_comments"
+    )
+    predictions: List[ProjectPredictionResponse] = Field(
+        default=[], validation_alias="latest_predictions"
+    )
+    totals: Optional[ProjectChildTotals] = None
+    links: Dict[str, str] = {}
+    # INFO: только в ответе на создание — вероятные дубли нового проекта
+    duplicates: List[ProjectDuplicate] = []
+
+    class Config:
+        from_attributes = True
+
+
+class ProjectSummaryResponse(BaseModel):
+    """Облегчённая карточка для списка проектов."""
+
+    oid: PyUUID
+    name: str
+    organization_name: str
+    inn: Optional[str] = None
+    project_number: Optional[str] = None
+    implementation_year: Optional[int] = None
+    stage_id: PyUUID
+    stage: str
+    service_id: PyUUID
+    service: str
+    manager_id: PyUUID
+    manager: str  # User.email
+    business_segment_id: Optional[PyUUID] = None
+    business_segment: Optional[str] = None
+    created_at: datetime
+    update_at: Optional[datetime] = None
+    version: int
+    is_archived: bool = False
+    # из project_summaries; пусто, пока сводка не собрана
+    probability: Optional[float] = None
+    total_revenue: Optional[float] = None
+    weighted_revenue: Optional[float] = None
+    last_activity_at: Optional[datetime] = None
+    last_stage_change_at: Optional[datetime] = None
+    comments_count: Optional[int] = None
+    history_count: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class ProjectPageResponse(BaseModel):
+    items: List[ProjectSummaryResponse]
+    next_cursor: Optional[str] = None
+
+
+class ProjectChangesResponse(BaseModel):
+    """Изменения с прошлого запроса: `cursor` передаётся в следующий."""
+
+    items: List[ProjectSummaryResponse]
+    deleted: List[PyUUID]
+    # проекты, переданные другому менеджеру: у текущего их больше не видно
+    left_scope: List[PyUUID]
+    cursor: str
+    has_more: bool
+
+
+class ProjectSearchHit(ProjectSummaryResponse):
+    rank: float
+
+
+class ProjectSearchResponse(BaseModel):
+    items: List[ProjectSearchHit]
+    limit: int
+    offset: int
+
+
+class OrganizationSuggestion(BaseModel):
+    organization_name: str
+    inn: Optional[str] = None
+    projects: int
+
+    class Config:
+        from_attributes = True
+
+
+class FacetCount(BaseModel):
+    id: Optional[PyUUID] = None
+    name: Optional[str] = None
+    count: int
+
+
+class ProjectFacetsResponse(BaseModel):
+    total: int
+    stage: List[FacetCount]
+    manager: List[FacetCount]
+    business_segment: List[FacetCount]
+    service: List[FacetCount]
+
+
 class ProjectRegistryResponse(BaseModel):
     project_id: PyUUID
     segment: Optional[str]
@@ -0,0 +1,30 @@
+__all__ = ["make_etag", "etag_matches"]
+import hashlib
+from typing import Any, Optional
+
+# INFO: слабые ETag (W/"...") — совпадение означает «то же содержимое»,
+# а не побайтно тот же ответ. Считаются по маркерам изменений из БД,
+# поэтому проверка If-None-Match не требует строить сам ответ.
+
+
+def make_etag(*parts: Any, version: Optional[int] = None) -> str:
+    """`version` ставится открыто перед хешем (`W/"3-..."`), чтобы тот же
+    ETag можно было передать в If-Match при изменении."""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    digest = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+    if version is not None:
+        digest = f"{version}-{digest}"
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Сравнение по правилам If-None-Match: список через запятую, `*`, без учёта W/."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
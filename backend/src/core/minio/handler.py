@@ -35,3 +35,10 @@ class MinioHandler:
             # Обязательно закрываем!
             response.close()
             response.release_conn()
+
+    def download_bytes(self, name: str) -> bytes:
+        """Объект целиком — для небольших файлов, которые читаются разом."""
+        return b"".join(self.download_file(name))
+
+    def remove_file(self, name: str):
+        self.client.remove_object(self.bucket, name)
@@ -0,0 +1,102 @@
+__all__ = ["encode_cursor", "decode_cursor", "paginate", "next_cursor"]
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID as PyUUID
+
+from sqlalchemy import Select, tuple_
+
+from src.core.exceptions import InvalidInputError
+
+# INFO: Keyset (cursor) пагинация.
+# Курсор — это значения ключа сортировки последней строки страницы,
+# упакованные в base64(json). Для клиента он непрозрачен, а запрос
+# страницы N стоит столько же, сколько запрос первой (нет OFFSET).
+# Если у списка несколько сортировок, первым элементом идёт её имя (`sort`):
+# курсор другой сортировки отклоняется, а не читает не тот диапазон.
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (PyUUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _load(value: Any, python_type: type) -> Any:
+    if value is None:
+        return None
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence[Any], sort: Optional[str] = None) -> str:
+    items = [_dump(v) for v in values]
+    if sort is not None:
+        items.insert(0, sort)
+    raw = json.dumps(items, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, types: Sequence[type], sort: Optional[str] = None
+) -> List[Any]:
+    """Распаковывает курсор и приводит значения к типам колонок сортировки.
+
+    Raises:
+        InvalidInputError: курсор повреждён или получен для другой сортировки.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list):
+            raise ValueError(cursor)
+        if sort is not None:
+            if not values or values.pop(0) != sort:
+                raise ValueError(cursor)
+        if len(values) != len(types):
+            raise ValueError(cursor)
+        return [_load(v, t) for v, t in zip(values, types)]
+    # INFO: Decimal("abc") — decimal.InvalidOperation, это ArithmeticError
+    except (ValueError, TypeError, ArithmeticError, binascii.Error):
+        raise InvalidInputError()
+
+
+def paginate(
+    query: Select,
+    columns: Sequence[Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True,
+    sort: Optional[str] = None,
+) -> Select:
+    """Добавляет к запросу keyset-условие, сортировку и лимит.
+
+    Выбирается `limit + 1` строк: лишняя строка говорит о наличии следующей
+    страницы и отрезается в `next_cursor`. Последняя колонка в `columns`
+    должна быть уникальной (обычно `oid`), чтобы порядок был стабильным.
+    """
+    if cursor:
+        values = decode_cursor(cursor, [c.type.python_type for c in columns], sort)
+        key = tuple_(*columns)
+        query = query.where(key < tuple_(*values) if descending else key > tuple_(*values))
+    order = [c.desc() if descending else c.asc() for c in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def next_cursor(
+    rows: Sequence[Any], limit: int, keys: Sequence[str], sort: Optional[str] = None
+) -> Tuple[Sequence[Any], Optional[str]]:
+    """Отрезает служебную строку и строит курсор на следующую страницу."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, key) for key in keys], sort)
@@ -17,6 +17,7 @@ __all__ = [
     "DepEvaluationTypeRep",
     "DepBusinessSegmentRep",
     "DepDashboardRep",
+    "DepProjectPredictionRep",
 ]
 from typing import Annotated
 from fastapi import Depends, Request
@@ -33,6 +34,7 @@ from src.card_of_poject.model import (
     PaymentType,
     Project,
     ProjectHistory,
+    ProjectPrediction,
     RevenueStatus,
     Service,
     Stage,
@@ -51,7 +53,10 @@ from src.card_of_poject.repository import (
     ProjectHistoryRepository,
     ProjectRepository,
 )
-from src.card_of_poject.repository.base_repository import DashboardRepository
+from src.card_of_poject.repository.base_repository import (
+    DashboardRepository,
+    ProjectPredictionRepository,
+)
 from src.config import Settings
 from src.core.auth.hasher import PasswordHasher
 from src.core.auth.repository import TokenRepository
@@ -137,6 +142,12 @@ async def get_project_history_repository(
     return ProjectHistoryRepository(session, model=ProjectHistory)
 
 
+async def get_project_prediction_repository(
+    session: AsyncSessionDep,
+) -> ProjectPredictionRepository:
+    return ProjectPredictionRepository(session, model=ProjectPrediction)
+
+
 async def get_project_repository(session: AsyncSessionDep) -> ProjectRepository:
     return ProjectRepository(session, model=Project)
 
@@ -194,6 +205,9 @@ DepProjectHistoryRep = Annotated[
     ProjectHistoryRepository, Depends(get_project_history_repository)
 ]
 DepProjectRep = Annotated[ProjectRepository, Depends(get_project_repository)]
+DepProjectPredictionRep = Annotated[
+    ProjectPredictionRepository, Depends(get_project_prediction_repository)
+]
 DepStageRep = Annotated[StageRepository, Depends(get_stage_repository)]
 DepCommentRep = Annotated[CommentRepository, Depends(get_comment_repository)]
 DepServiceRep = Annotated[ServiceRepository, Depends(get_service_repository)]
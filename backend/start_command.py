@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
-import uuid
 
 from sqlalchemy import select
+from src.core.models.id import uuid7
 from src.core.models.role import Role
 from src.database import session_maker
 from src.dependency import get_password_hasher
@@ -24,7 +24,7 @@ async def command():
 
         if admin is None:
             # Создаём только если нет
-            oid = uuid.uuid4()
+            oid = uuid7()
             hashed_password = hasher.hash_password(settings.admin.password)
             admin_user = User(
                 oid=oid,
@@ -0,0 +1,76 @@
+import sys
+
+from sqlalchemy import select, text
+
+from src.card_of_poject.model import Project
+from src.database import session_maker
+
+import structlog
+
+log = structlog.get_logger()
+
+BATCH_SIZE = 1000
+
+REFRESH = text("SELECT project_summary_refresh(CAST(:pids AS uuid[]))")
+# INFO: счётчики сводки триггеры ведут приращениями, поэтому сверка идёт
+# с пересчётом с нуля. last_activity_at не сравнивается: удаления его не
+# откатывают, он только растёт.
+DRIFT = text(
+    """
+    SELECT c.project_id
+    FROM project_summary_compute(CAST(:pids AS uuid[])) c
+    LEFT JOIN project_summaries s ON s.project_id = c.project_id
+    WHERE s.project_id IS NULL
+       OR (s.total_revenue, s.total_costs, s.weighted_revenue, s.probability,
+           s.last_stage_change_at, s.comments_count, s.history_count)
+          IS DISTINCT FROM
+          (c.total_revenue, c.total_costs, c.weighted_revenue, c.probability,
+           c.last_stage_change_at, c.comments_count, c.history_count)
+    """
+)
+
+
+async def command(check: bool = False):
+    """Пересобирает project_summaries для всех проектов.
+
+    Триггеры держат сводку в актуальном состоянии сами; команда нужна для
+    первичного заполнения и после ручных правок в обход триггеров.
+    Проекты обрабатываются пачками по oid, каждая пачка — своя транзакция.
+
+    Args:
+        check: только сверить счётчики с пересчётом и пересобрать
+            разошедшиеся проекты.
+    """
+    last_oid = None
+    total = 0
+    drifted = 0
+    async with session_maker() as session:
+        while True:
+            query = select(Project.oid).order_by(Project.oid).limit(BATCH_SIZE)
+            if last_oid is not None:
+                query = query.where(Project.oid > last_oid)
+            oids = (await session.execute(query)).scalars().all()
+            if not oids:
+                break
+            pids = list(oids)
+            if check:
+                pids = (await session.execute(DRIFT, {"pids": pids})).scalars().all()
+                if pids:
+                    log.warning(
+                        "Сводка разошлась", projects=[str(pid) for pid in pids]
+                    )
+            if pids:
+                await session.execute(REFRESH, {"pids": list(pids)})
+            await session.commit()
+            last_oid = oids[-1]
+            total += len(oids)
+            drifted += len(pids)
+            log.info("Сводка пересобрана", projects=total, refreshed=drifted)
+
+    log.info("Пересборка сводки завершена", projects=total, refreshed=drifted)
+
+
+if __name__ == "__main__":
+    from anyio import run
+
+    run(command, sys.argv[1:] == ["check"])
@@ -0,0 +1,99 @@
+import sys
+import time
+from typing import Callable
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+
+from src.core.models.id import uuid7
+from src.database import session_maker
+
+import structlog
+
+log = structlog.get_logger()
+
+BATCH_SIZE = 10_000
+# строк на проект: как периоды одного проекта, которые вставляются вслед за ним
+ROWS_PER_PARENT = 10
+
+# INFO: таблица повторяет financial_periods в том, что важно для вставки:
+# первичный ключ uuid и индекс по FK на проект.
+CREATE = """
+CREATE TABLE {table} (
+    oid uuid PRIMARY KEY,
+    project_id uuid NOT NULL,
+    revenue numeric(15, 2) NOT NULL DEFAULT 0
+)
+"""
+INDEX = "CREATE INDEX {table}_project_id ON {table} (project_id)"
+INSERT = """
+INSERT INTO {table} (oid, project_id)
+SELECT * FROM unnest(CAST(:oids AS uuid[]), CAST(:pids AS uuid[]))
+"""
+SIZES = """
+SELECT
+    pg_relation_size('{table}_pkey'),
+    pg_relation_size('{table}_project_id'),
+    pg_total_relation_size('{table}')
+"""
+
+
+async def _measure(generate: Callable[[], UUID], rows: int) -> dict:
+    """Вставляет `rows` строк с ключами от `generate` и меряет время и индексы.
+
+    Время — только выполнение INSERT и COMMIT, без генерации ключей.
+    """
+    table = f"uuid_benchmark_{generate.__name__}"
+    elapsed = 0.0
+    async with session_maker() as session:
+        await session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        await session.execute(text(CREATE.format(table=table)))
+        await session.execute(text(INDEX.format(table=table)))
+        await session.commit()
+        for start in range(0, rows, BATCH_SIZE):
+            size = min(BATCH_SIZE, rows - start)
+            parents = [generate() for _ in range(-(-size // ROWS_PER_PARENT))]
+            params = {
+                "oids": [generate() for _ in range(size)],
+                "pids": [parents[i // ROWS_PER_PARENT] for i in range(size)],
+            }
+            started = time.perf_counter()
+            await session.execute(text(INSERT.format(table=table)), params)
+            await session.commit()
+            elapsed += time.perf_counter() - started
+        pkey, fkey, total = (await session.execute(text(SIZES.format(table=table)))).one()
+        await session.execute(text(f"DROP TABLE {table}"))
+        await session.commit()
+    return {
+        "rows_per_second": round(rows / elapsed),
+        "pkey_mb": round(pkey / 2**20, 1),
+        "project_id_index_mb": round(fkey / 2**20, 1),
+        "total_mb": round(total / 2**20, 1),
+    }
+
+
+async def command(rows: int):
+    """Сравнивает вставку с ключами uuid4 и uuid7 на `rows` строках.
+
+    Для каждого генератора создаётся и потом удаляется своя таблица. В лог
+    пишутся скорость вставки и размеры индексов.
+
+    Запуск: `make benchmark-uuid ROWS=1000000` или в контейнере
+    `python uuid_benchmark_command.py 1000000`. На каждый генератор — одна
+    строка лога `Вставка завершена` с полями keys, rows, rows_per_second,
+    pkey_mb, project_id_index_mb и total_mb.
+
+    INFO: цифры зависят от сервера БД (shared_buffers, диск, размер таблиц),
+    поэтому в репозитории не хранятся: сравнивать uuid4 и uuid7 имеет смысл
+    на том же стенде, где работает приложение, на объёме не меньше
+    shared_buffers — иначе случайная вставка uuid4 не выходит за кеш.
+    """
+    for generate in (uuid4, uuid7):
+        result = await _measure(generate, rows)
+        log.info("Вставка завершена", keys=generate.__name__, rows=rows, **result)
+
+
+if __name__ == "__main__":
+    from anyio import run
+
+    run(command, int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)